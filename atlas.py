@@ -0,0 +1,88 @@
+# ==========================================
+# Block World - texture atlas
+# ==========================================
+import os
+import pickle
+
+import pygame
+
+ATLAS_VERSION = 1
+ATLAS_WIDTH = 512
+ATLAS_PADDING = 1
+
+
+# ==========================================================
+# PACKING
+# sprites go on shelves, tallest first, left to right; each
+# sprite comes back as a subsurface of the one atlas surface
+# ==========================================================
+def pack_sprites(sprites):
+    # sprites: name -> Surface. returns (atlas, {name: Rect})
+    order = sorted(sprites, key=lambda name: -sprites[name].get_height())
+    rects = {}
+    x = y = shelf_h = 0
+    for name in order:
+        w, h = sprites[name].get_size()
+        if x + w > ATLAS_WIDTH:
+            x = 0
+            y += shelf_h + ATLAS_PADDING
+            shelf_h = 0
+        rects[name] = pygame.Rect(x, y, w, h)
+        x += w + ATLAS_PADDING
+        shelf_h = max(shelf_h, h)
+
+    atlas = pygame.Surface((ATLAS_WIDTH, max(1, y + shelf_h)), pygame.SRCALPHA)
+    for name, rect in rects.items():
+        atlas.blit(sprites[name], rect)
+    return atlas.convert_alpha(), rects
+
+
+def split_atlas(atlas, rects):
+    return {name: atlas.subsurface(rect) for name, rect in rects.items()}
+
+
+# ==========================================================
+# DISK CACHE
+# the packed atlas is pickled as raw RGBA next to its sources,
+# keyed by their mtimes (and whatever else shaped the sprites),
+# so a warm start skips decoding, scaling and tinting
+# ==========================================================
+def source_key(paths):
+    return tuple((os.path.basename(p), os.path.getmtime(p) if os.path.exists(p) else None) for p in paths)
+
+
+def load_atlas(path, key):
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data["key"] != key:
+            return None
+        atlas = pygame.image.frombytes(data["pixels"], data["size"], "RGBA").convert_alpha()
+        return atlas, {name: pygame.Rect(r) for name, r in data["rects"].items()}
+    except (OSError, EOFError, pickle.UnpicklingError, KeyError, TypeError, ValueError):
+        return None
+
+
+def save_atlas(path, key, atlas, rects):
+    data = {
+        "key": key,
+        "size": atlas.get_size(),
+        "pixels": pygame.image.tobytes(atlas, "RGBA"),
+        "rects": {name: tuple(rect) for name, rect in rects.items()},
+    }
+    try:
+        with open(path, "wb") as f:
+            pickle.dump(data, f)
+    except OSError:
+        pass
+
+
+def cached_sprites(path, sources, make_sprites, extra_key=()):
+    # name -> sprite, from the cache at `path` if it's still fresh,
+    # else from make_sprites() (which reads `sources`) and re-cached
+    key = (ATLAS_VERSION, extra_key, source_key(sources))
+    hit = load_atlas(path, key)
+    if hit is None:
+        hit = pack_sprites(make_sprites())
+        save_atlas(path, key, *hit)
+    return split_atlas(*hit)
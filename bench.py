@@ -0,0 +1,509 @@
+# ==========================================
+# Block World - benchmarks
+# run:  python bench.py [name ...]
+# ==========================================
+import os
+import pickle
+import random
+import sys
+import time
+
+import numpy as np
+
+from world import WorldGrid
+import worldgen
+from worldgen import generate_world, pregenerate, OccupancyIndex
+from templates import find_template
+from pathfinding import build_dist_map, choose_next_cell
+
+ROWS = 450
+COLS = 750
+GRASS = 1
+WATER = 5
+VOID = 0
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def chunk_memory(world):
+    # bytes held by resident chunks (shared uniform chunks count once)
+    seen = set()
+    total = 0
+    for chunk in world._chunks.values():
+        for obj in (chunk, chunk.data):
+            if obj is not None and id(obj) not in seen:
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+    return total
+
+
+def report(name, old, new, unit="s"):
+    ratio = old / new if new else float("inf")
+    print(f"  {name:<28} list {old:>10.4f}{unit}   grid {new:>10.4f}{unit}   x{ratio:.1f}")
+
+
+# ==========================================================
+# WORLD GRID vs LIST OF LISTS
+# ==========================================================
+def bench_world_grid():
+    print(f"world grid {ROWS}x{COLS}")
+
+    def build_grid():
+        grid_ = WorldGrid(ROWS, COLS, fill=GRASS, outside=VOID)
+        grid_.prefetch(0, 0, ROWS - 1, COLS - 1)
+        return grid_
+
+    # build
+    old_build = timed(lambda: [[GRASS for _ in range(COLS)] for _ in range(ROWS)])
+    new_build = timed(build_grid)
+    report("build", old_build, new_build)
+
+    lol = [[GRASS for _ in range(COLS)] for _ in range(ROWS)]
+    grid = build_grid()
+
+    # memory (the ints themselves are shared small ints, rows hold pointers)
+    old_mem = sys.getsizeof(lol) + sum(sys.getsizeof(row) for row in lol)
+    # (plus the decoded copies of the last prefetched chunks, and get()'s index)
+    new_mem = sys.getsizeof(grid._chunks) + chunk_memory(grid) + sum(map(sys.getsizeof, grid._decoded.values())) + \
+        sys.getsizeof(grid._tiles)
+    print(f"  {'memory':<28} list {old_mem / 1024:>9.0f}KB   grid {new_mem / 1024:>9.0f}KB   x{old_mem / new_mem:.1f}")
+
+    # random single-tile reads (same bounds check as get_block)
+    rng = random.Random(1)
+    coords = [(rng.randrange(-2, ROWS + 2), rng.randrange(-2, COLS + 2)) for _ in range(200_000)]
+
+    def lol_get(r, c):
+        if 0 <= r < ROWS and 0 <= c < COLS:
+            return lol[r][c]
+        return VOID
+
+    get = grid.get
+    report("random get x200k",
+           timed(lambda: [lol_get(r, c) for r, c in coords]),
+           timed(lambda: [get(r, c) for r, c in coords]))
+
+    # the same around the player of a generated world, whose view the
+    # game prefetches every frame (so those chunks are read decoded)
+    world, _ = generate_world("crowded", "normal", ROWS, COLS, seed=1)
+    pr, pc = ROWS // 2, COLS // 2
+    world.prefetch(pr - 32, pc - 32, pr + 32, pc + 32)
+    world_lol = world.rect(0, 0, ROWS, COLS).tolist()
+    near = [(rng.randrange(pr - 32, pr + 32), rng.randrange(pc - 32, pc + 32)) for _ in range(200_000)]
+
+    def world_lol_get(r, c):
+        if 0 <= r < ROWS and 0 <= c < COLS:
+            return world_lol[r][c]
+        return VOID
+
+    world_get = world.get
+    report("get near player x200k",
+           timed(lambda: [world_lol_get(r, c) for r, c in near]),
+           timed(lambda: [world_get(r, c) for r, c in near]))
+
+    # viewport scan like the render loop (28x18 tiles, 500 frames)
+    def scan_lol():
+        for f in range(500):
+            r0, c0 = (f * 7) % (ROWS - 18), (f * 13) % (COLS - 28)
+            for r in range(r0, r0 + 18):
+                for c in range(c0, c0 + 28):
+                    lol_get(r, c)
+
+    def scan_grid():
+        for f in range(500):
+            r0, c0 = (f * 7) % (ROWS - 18), (f * 13) % (COLS - 28)
+            for r in range(r0, r0 + 18):
+                for c in range(c0, c0 + 28):
+                    get(r, c)
+
+    report("viewport scan x500", timed(scan_lol), timed(scan_grid))
+
+    # worldgen style "is this padded rect all grass" checks
+    # (worldgen works on a numpy buffer per region)
+    cells = np.full((ROWS, COLS), GRASS, dtype=np.uint8)
+    rects = [(rng.randrange(2, ROWS - 10), rng.randrange(2, COLS - 10)) for _ in range(20_000)]
+
+    def clear_lol():
+        for top, left in rects:
+            all(lol[r][c] == GRASS for r in range(top, top + 8) for c in range(left, left + 8))
+
+    def clear_grid():
+        for top, left in rects:
+            bool((cells[top:top + 8, left:left + 8] == GRASS).all())
+
+    report("8x8 area check x20k", timed(clear_lol), timed(clear_grid))
+
+    # stamping structures
+    def stamp_lol():
+        for top, left in rects:
+            for r in range(top, top + 5):
+                for c in range(left, left + 5):
+                    lol[r][c] = WATER
+
+    def stamp_grid():
+        for top, left in rects:
+            cells[top:top + 5, left:left + 5] = WATER
+
+    report("5x5 stamp x20k", timed(stamp_lol), timed(stamp_grid))
+
+    # whole-world scans used by structure detection
+    report("find tiles",
+           timed(lambda: [(r, c) for r, row in enumerate(lol) for c, v in enumerate(row) if v == WATER]),
+           timed(lambda: grid.positions(WATER, 0, 0, ROWS, COLS)))
+
+    # saving
+    old_blob = pickle.dumps(lol)
+    new_blob = pickle.dumps(grid.to_save())
+    report("pickle save", timed(lambda: pickle.dumps(lol)), timed(lambda: pickle.dumps(grid.to_save())))
+    print(f"  {'save size':<28} list {len(old_blob) / 1024:>9.0f}KB   grid {len(new_blob) / 1024:>9.0f}KB")
+
+
+# ==========================================================
+# LAZY STARTUP vs WORLD SIZE
+# ==========================================================
+def bench_lazy_startup():
+    print("startup (generate_world + spawn area) vs world_multiplier")
+    for mult in (15, 30, 60, 120):
+        rows, cols = 15 * mult, 25 * mult
+
+        def start():
+            world, _ = generate_world("crowded", "normal", rows, cols, seed=1)
+            r, c = rows // 2, cols // 2
+            world.prefetch(r - 24, c - 28, r + 24, c + 28)
+            return world
+
+        t = timed(start, repeat=1)
+        world = start()
+        mem = chunk_memory(world)
+        print(f"  x{mult:<4} {rows}x{cols:<6}  {t * 1000:8.1f}ms   "
+              f"{world.loaded_chunks():4d} chunks  {mem / 1024:6.0f}KB resident")
+
+
+# ==========================================================
+# PALETTE CHUNKS vs ONE BYTE PER TILE
+# ==========================================================
+def bench_chunk_memory():
+    print(f"resident chunk memory, full {ROWS}x{COLS} world")
+    dense_chunk = sys.getsizeof(bytearray(256))
+    for preset in ("normal", "crowded", "free"):
+        world, _ = generate_world(preset, "normal", ROWS, COLS, seed=1)
+        world.prefetch(0, 0, ROWS - 1, COLS - 1)
+        forms = {}
+        for chunk in world._chunks.values():
+            forms[chunk.form] = forms.get(chunk.form, 0) + 1
+        dense = dense_chunk * world.loaded_chunks()
+        packed = chunk_memory(world)
+        mix = "  ".join(f"{k} {v}" for k, v in sorted(forms.items()))
+        print(f"  {preset:<8} dense {dense / 1024:6.0f}KB   palette {packed / 1024:6.0f}KB   "
+              f"x{dense / packed:5.1f}   ({mix})")
+
+
+# ==========================================================
+# OCCUPANCY INDEX vs SLICE CHECKS
+# a region that is mostly full, so placements keep missing
+# ==========================================================
+def bench_occupancy():
+    print("area checks in a crowded 64x64 region")
+    rng = random.Random(1)
+    cells = np.full((64, 64), GRASS, dtype=np.uint8)
+    for _ in range(300):
+        r, c = rng.randrange(60), rng.randrange(60)
+        cells[r:r + 3, c:c + 3] = WATER
+    rects = [(rng.randrange(56), rng.randrange(56), rng.randint(3, 8)) for _ in range(50_000)]
+
+    def slices():
+        for top, left, size in rects:
+            bool((cells[top:top + size, left:left + size] == GRASS).all())
+
+    def sat():
+        index = OccupancyIndex(cells, 0, 0, (-100, -100))
+        for top, left, size in rects:
+            index.is_clear(top, left, size, size)
+
+    old, new = timed(slices), timed(sat)
+    print(f"  {'check x50k':<28} slice {old:>9.4f}s   sat {new:>9.4f}s   x{old / new:.1f}")
+
+
+# ==========================================================
+# PREGENERATION: ONE PROCESS vs A POOL
+# ==========================================================
+def bench_pregenerate():
+    workers = os.cpu_count() or 1
+    print(f"pregenerate whole world, 1 vs {workers} workers")
+    min_regions, worldgen.PARALLEL_MIN_REGIONS = worldgen.PARALLEL_MIN_REGIONS, 0
+    for mult in (60, 120):
+        rows, cols = 15 * mult, 25 * mult
+
+        def build(n):
+            world, _ = generate_world("crowded", "normal", rows, cols, seed=1)
+            pregenerate(world, workers=n)
+
+        serial = timed(lambda: build(1), repeat=1)
+        pooled = timed(lambda: build(workers), repeat=1)
+        print(f"  x{mult:<4} {rows}x{cols:<6}  serial {serial * 1000:8.1f}ms   pool {pooled * 1000:8.1f}ms   "
+              f"x{serial / pooled:.1f}")
+    worldgen.PARALLEL_MIN_REGIONS = min_regions
+
+
+# ==========================================================
+# TERRAIN (NOISE) vs CROWDED (REJECTION SAMPLING)
+# ==========================================================
+def baseline_crowded(rows, cols, rng):
+    # generate_world("crowded") as it was before the world grid: a list
+    # of row lists, every placement checked tile by tile (altar left out)
+    grass, water, wood, leaves, brick, stone, dirt = 1, 5, 3, 4, 7, 6, 2
+    world = [[grass for _ in range(cols)] for _ in range(rows)]
+    altar_r = rng.randint(10, rows - 11)
+    altar_c = rng.randint(10, cols - 11)
+
+    def area_is_clear(top, left, height, width, pad=1):
+        for r in range(top - pad, top + height + pad):
+            for c in range(left - pad, left + width + pad):
+                if r < 0 or c < 0 or r >= rows or c >= cols:
+                    return False
+                if world[r][c] != grass:
+                    return False
+                if abs(r - altar_r) <= 3 and abs(c - altar_c) <= 3:
+                    return False
+        return True
+
+    def fill(top, left, height, width, bid):
+        for r in range(top, top + height):
+            for c in range(left, left + width):
+                world[r][c] = bid
+
+    # lakes
+    for _ in range(60):
+        for _ in range(80):
+            size = rng.randint(3, 5)
+            row = rng.randint(1, rows - size - 2)
+            col = rng.randint(1, cols - size - 2)
+            if area_is_clear(row, col, size, size, pad=2):
+                fill(row, col, size, size, water)
+                break
+    # small trees
+    for _ in range(250):
+        for _ in range(200):
+            row = rng.randint(2, rows - 3)
+            col = rng.randint(2, cols - 3)
+            if area_is_clear(row - 1, col - 1, 3, 3, pad=2):
+                world[row][col] = wood
+                world[row - 1][col] = world[row + 1][col] = leaves
+                world[row][col - 1] = world[row][col + 1] = leaves
+                break
+    # houses
+    for _ in range(55):
+        for _ in range(140):
+            top = rng.randint(2, rows - 6)
+            left = rng.randint(2, cols - 6)
+            if area_is_clear(top, left, 4, 4):
+                fill(top, left, 4, 4, brick)
+                fill(top + 1, left + 1, 2, 2, wood)
+                break
+    # rock veins
+    for _ in range(150):
+        for _ in range(140):
+            top = rng.randint(2, rows - 6)
+            left = rng.randint(2, cols - 6)
+            if area_is_clear(top, left, 4, 4):
+                n = rng.randint(6, 12)
+                spots = [(top + r, left + c) for r in range(4) for c in range(4)]
+                rng.shuffle(spots)
+                for rr, cc in spots[:n]:
+                    world[rr][cc] = stone
+                break
+    # big trees
+    for _ in range(80):
+        for _ in range(160):
+            r = rng.randint(3, rows - 5)
+            c = rng.randint(3, cols - 5)
+            if area_is_clear(r - 2, c - 2, 6, 6):
+                fill(r - 1, c - 1, 4, 4, leaves)
+                fill(r - 2, c, 6, 2, leaves)
+                fill(r, c - 2, 2, 6, leaves)
+                fill(r, c, 2, 2, wood)
+                break
+    # dirt patches
+    patch_sizes = [(1, 2), (2, 1), (2, 2), (2, 3), (3, 2)]
+    for _ in range(220):
+        for _ in range(120):
+            h, w = rng.choice(patch_sizes)
+            top = rng.randint(2, rows - h - 3)
+            left = rng.randint(2, cols - w - 3)
+            if area_is_clear(top, left, h, w):
+                fill(top, left, h, w, dirt)
+                break
+    return world
+
+
+def bench_terrain():
+    # the target: a terrain world with 10x the area generated in less
+    # time than the crowded preset before this work (baseline_crowded)
+    workers = os.cpu_count() or 1
+    print(f"whole-world generation, terrain vs crowded ({workers} workers)")
+
+    def build(preset, mult, n):
+        # mult scales the world's area, like world_multiplier does per side
+        rows, cols = int(ROWS * mult ** 0.5), int(COLS * mult ** 0.5)
+        world, _ = generate_world(preset, "normal", rows, cols, seed=1)
+        pregenerate(world, workers=n)
+
+    def start(mult):
+        # what the first frame waits for: the regions around the spawn
+        rows, cols = int(ROWS * mult ** 0.5), int(COLS * mult ** 0.5)
+        world, _ = generate_world("terrain", "normal", rows, cols, seed=1)
+        r, c = rows // 2, cols // 2
+        world.prefetch(r - 24, c - 28, r + 24, c + 28)
+
+    min_regions, worldgen.PARALLEL_MIN_REGIONS = worldgen.PARALLEL_MIN_REGIONS, 0
+    baseline = timed(lambda: baseline_crowded(ROWS, COLS, random.Random(1)))
+    print(f"  {'baseline crowded 1x (lists)':<32} {baseline * 1000:8.1f}ms")
+    crowded = timed(lambda: build("crowded", 1, 1))
+    print(f"  {'crowded  1x area, 1 worker':<32} {crowded * 1000:8.1f}ms")
+    for mult, n in sorted({(1, 1), (10, 1), (10, workers)}):
+        t = timed(lambda: build("terrain", mult, n), repeat=1 if mult > 1 else 3)
+        print(f"  {f'terrain {mult:>2}x area, {n} worker':<32} {t * 1000:8.1f}ms   x{baseline / t:.2f} vs baseline")
+    worldgen.PARALLEL_MIN_REGIONS = min_regions
+    first = timed(lambda: start(10))
+    print(f"  {'terrain 10x area, spawn only':<32} {first * 1000:8.1f}ms   x{baseline / first:.2f} vs baseline")
+    print(f"  target (whole terrain 10x world faster than baseline crowded 1x): {'met' if t < baseline else 'MISSED'}")
+    print(f"  (terrain 10x up to its first frame: {'met' if first < baseline else 'MISSED'})")
+
+
+# ==========================================================
+# HOUSE DETECTION: PER-TILE LOOPS vs TEMPLATE MATCH
+# ==========================================================
+def bench_find_houses():
+    print(f"find every house in a crowded {ROWS}x{COLS} world")
+    brick, wood = 7, 3
+    world, _ = generate_world("crowded", "normal", ROWS, COLS, seed=1)
+    pregenerate(world)
+
+    def loops():
+        # what find_houses did before: 4x4 check from every brick tile
+        found = []
+        for r, c in world.positions(brick, 0, 0, ROWS, COLS):
+            if r > ROWS - 4 or c > COLS - 4:
+                continue
+            ok = True
+            for rr in range(r, r + 4):
+                for cc in range(c, c + 4):
+                    inside = (r + 1 <= rr <= r + 2) and (c + 1 <= cc <= c + 2)
+                    if world.get(rr, cc) != (wood if inside else brick):
+                        ok = False
+                        break
+                if not ok:
+                    break
+            if ok:
+                found.append((r, c))
+        return found
+
+    cells = world.rect(0, 0, ROWS, COLS)
+
+    def template():
+        return find_template("house", cells)
+
+    assert loops() == template()
+    old, new = timed(loops), timed(template)
+    print(f"  {f'{len(template())} houses':<28} loops {old:>9.4f}s   template {new:>9.4f}s   x{old / new:.1f}")
+    print(f"  {'(copying the tiles out)':<28} {timed(lambda: world.rect(0, 0, ROWS, COLS)):>15.4f}s")
+
+
+# ==========================================================
+# HEADLESS CORE: IMPORT TIME AND ZOMBIE PATHFINDING
+# ==========================================================
+def bench_pathfinding():
+    import subprocess
+    code = "import time; t = time.perf_counter(); import config, saves, pathfinding, entities, world, worldgen; " \
+           "import sys; print((time.perf_counter() - t) * 1000, 'pygame' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+    print(f"import the core: {float(out[0]):.1f}ms (pygame loaded: {out[1]})")
+
+    world, _ = generate_world("crowded", "normal", ROWS, COLS, seed=1)
+    pregenerate(world)
+    pr, pc = ROWS // 2, COLS // 2
+    print(f"zombie distance map, radius 28 around the centre of a crowded {ROWS}x{COLS} world")
+    # like the game: one tile window around the player (copying it out is
+    # part of the time), read by the BFS and by every next step
+    def window():
+        return world.window(pr - 29, pc - 29, 59, 59)
+
+    for diagonal in (False, True):
+        near = window()
+        dist = build_dist_map(near, pr, pc, 28, diagonal)
+        t = timed(lambda: build_dist_map(window(), pr, pc, 28, diagonal))
+        cells = list(dist)
+        step = timed(lambda: [choose_next_cell(near, dist, r, c, pr, pc, diagonal) for r, c in cells])
+        label = "hard (8-way)" if diagonal else "normal (4-way)"
+        print(f"  {label:<28} {len(dist):>5} tiles {t * 1000:8.2f}ms   next step for all {step * 1000:8.2f}ms")
+
+
+
+# ==========================================================
+# HEADLESS SIMULATION: TICKS PER SECOND
+# a whole day and night of survival, no window, no frame cap
+# ==========================================================
+def bench_simulation():
+    from simulation import Simulation
+    from config import CYCLE_FRAMES, FPS
+
+    print(f"simulation ticks, one day + night ({CYCLE_FRAMES} ticks), crowded {ROWS}x{COLS}")
+    for difficulty, move in (("normal", (0, 0)), ("hard", (0, 0)), ("hard", (1, 1))):
+        sim = Simulation.generate("survival", "crowded", difficulty, seed=1, rows=ROWS, cols=COLS,
+                                  rng=random.Random(1))
+        pregenerate(sim.world)
+        sim.invuln_timer = 10 ** 9
+        t = time.perf_counter()
+        sim.run(CYCLE_FRAMES, {"move": move})
+        dt = time.perf_counter() - t
+        label = f"{difficulty}, {'walking' if move != (0, 0) else 'standing'}"
+        print(f"  {label:<28} {CYCLE_FRAMES / dt:>8.0f} ticks/s   x{CYCLE_FRAMES / dt / FPS:6.1f} real time   "
+              f"{len(sim.zombies):3d} zombies")
+    print(f"  (pygame loaded: {'pygame' in sys.modules})")
+
+
+# ==========================================================
+# DIRT PATCHES ON A LONG WALK (INFINITE WORLD)
+# only chunks in memory keep their tile labels
+# ==========================================================
+def bench_dirt_patches():
+    from simulation import Simulation
+    from config import blocksize
+
+    print("dirt patch index, infinite terrain world, walking east")
+    sim = Simulation.generate("creative", "terrain", seed=4, infinite=True)
+    patches = sim.dirt_patches
+    for steps in (300, 600, 1200):
+        while sim.frame < steps:
+            sim.px += 40 * blocksize
+            sim.step()
+        print(f"  {steps:5d} steps  {len(sim.world.generated_regions):5d} regions   "
+              f"{len(patches.pieces):7d} pieces   {len(patches.spawn_cells):6d} patches   "
+              f"{sum(rec[1] is None for rec in patches.chunks.values()):6d} chunks out")
+
+
+BENCHES = {
+    "world_grid": bench_world_grid,
+    "lazy_startup": bench_lazy_startup,
+    "chunk_memory": bench_chunk_memory,
+    "occupancy": bench_occupancy,
+    "pregenerate": bench_pregenerate,
+    "terrain": bench_terrain,
+    "find_houses": bench_find_houses,
+    "pathfinding": bench_pathfinding,
+    "simulation": bench_simulation,
+    "dirt_patches": bench_dirt_patches,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHES)
+    for name in names:
+        BENCHES[name]()
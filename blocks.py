@@ -0,0 +1,27 @@
+# ==========================================
+# Block World - block ids
+# ==========================================
+
+BLOCKS = {
+    0: "void",
+    1: "grass",
+    2: "dirt",
+    3: "wood",
+    4: "leaves",
+    5: "water",
+    6: "stone",
+    7: "brick",
+    8: "core",
+}
+
+VOID = 0
+GRASS = 1
+DIRT = 2
+WOOD = 3
+LEAVES = 4
+WATER = 5
+STONE = 6
+BRICK = 7
+CORE = 8
+
+SOLID_BLOCKS = {WOOD, LEAVES, STONE, BRICK, CORE}
@@ -0,0 +1,141 @@
+# ==========================================
+# Block World - settings
+# plain constants, no pygame: safe to import anywhere
+# ==========================================
+
+# ==========================================================
+# VERSION
+# ==========================================================
+GAME_VERSION = "Alpha-0.9"
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+blocksize = 32
+base_cols = 25
+base_rows = 15
+
+# WORLD IS DOUBLED
+world_multiplier = 30
+
+toolbar_height = 64
+
+screen_width = base_cols * blocksize
+view_height = base_rows * blocksize
+screen_height = view_height + toolbar_height
+
+world_cols = base_cols * world_multiplier
+world_rows = base_rows * world_multiplier
+
+# the start menu starts building the highlighted world once the
+# selection has been left alone for this many frames
+SPECULATE_DELAY_FRAMES = 15
+
+# the rest of a finite world is generated a region per frame, on
+# frames that took less than this many ms (else when first touched)
+IDLE_GENERATE_MS = 8
+
+# infinite worlds keep at most this many 16x16 chunks in memory,
+# the rest go to a region file on disk
+CHUNK_BUDGET = 1024
+
+# pre-rendered chunk surfaces kept for drawing the world (512x512 each)
+CHUNK_SURFACE_BUDGET = 32
+
+# push only the screen areas that changed while the camera holds still
+DIRTY_RECT_UPDATES = True
+
+PLAYER_SIZE = 32
+HITBOX_SIZE = 24
+player_speed = 4
+
+FPS = 60
+
+# ==========================================================
+# COMBAT
+# ==========================================================
+MAX_HEALTH = 10
+ZOMBIE_HITBOX = 20
+ZOMBIE_DAMAGE_COOLDOWN = 60
+MAX_ZOMBIES_TOTAL = 35
+
+NORMAL_ZOMBIE_SPEED_FACTOR = 0.75
+HARD_ZOMBIE_SPEED_FACTOR = 0.90
+
+NORMAL_ZOMBIE_HITS = 3
+HARD_ZOMBIE_HITS = 5
+
+NORMAL_DIRT_SPAWN = 0.20
+HARD_DIRT_SPAWN = 0.25
+
+NORMAL_HOUSE_SPAWN = 0.10
+HARD_HOUSE_SPAWN = 0.25
+
+HARD_DAMAGE_MULT = 1.5
+HOUSE_RESPAWN_SECONDS = 10
+
+# ==========================================================
+# PATHFINDING
+# ==========================================================
+PATH_RADIUS_TILES = 28
+PATH_UPDATE_FRAMES = 8
+
+# ==========================================================
+# PASSIVE HEAL (FIX: these were missing in your file)
+# ==========================================================
+HEAL_DELAY_FRAMES = 60 * 4      # 4 seconds after last hit
+HEAL_TICK_FRAMES  = 60 * 2      # heal every 2 seconds
+HEAL_AMOUNT       = 1.0         # heal 1 HP per tick
+
+# ==========================================================
+# DAY / NIGHT
+# ==========================================================
+DAY_SECONDS = 60
+NIGHT_SECONDS = 60
+DAY_FRAMES = DAY_SECONDS * FPS
+NIGHT_FRAMES = NIGHT_SECONDS * FPS
+CYCLE_FRAMES = DAY_FRAMES + NIGHT_FRAMES
+
+# light level of the world layer (255 = full day) for every cycle_frame;
+# it fades to NIGHT_LIGHT over the DUSK_FRAMES before night starts and
+# back up over the last DUSK_FRAMES of the night
+NIGHT_LIGHT = 150
+DUSK_FRAMES = 5 * FPS
+
+def build_light_lut():
+    lut = []
+    for f in range(CYCLE_FRAMES):
+        if f < DAY_FRAMES - DUSK_FRAMES:
+            dark = 0.0
+        elif f < DAY_FRAMES:
+            dark = (f - (DAY_FRAMES - DUSK_FRAMES)) / DUSK_FRAMES
+        elif f < CYCLE_FRAMES - DUSK_FRAMES:
+            dark = 1.0
+        else:
+            dark = (CYCLE_FRAMES - f) / DUSK_FRAMES
+        lut.append(int(round(255 - (255 - NIGHT_LIGHT) * dark)))
+    return lut
+
+LIGHT_LUT = build_light_lut()
+
+BLOOD_MOON_CHANCE_NORMAL = 0.25
+BLOOD_MOON_CHANCE_HARD = 0.30
+BLOOD_MOON_DAMAGE_MULT = 1.5
+BLOOD_MOON_Z_SPEED_FACTOR = 0.95
+
+RESPAWN_IMMUNITY_SECONDS = 3.5
+RESPAWN_IMMUNITY_FRAMES = int(RESPAWN_IMMUNITY_SECONDS * FPS)
+
+# ==========================================================
+# ALTAR / DROPS
+# ==========================================================
+CORE_MINE_TIME = FPS * 10                 # 10 seconds
+ALTAR_BROKEN_PAUSE_FRAMES = FPS * 5       # 5 seconds pause text
+ALTAR_ZOMBIE_SPEED_MULT = 1.05            # after altar breaks
+
+ITEM_PICKUP_RADIUS = 22                   # pickup distance
+
+# ==========================================================
+# BLOCKS (ids live in blocks.py)
+# ==========================================================
+DELETE = -1
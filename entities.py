@@ -0,0 +1,66 @@
+# ==========================================
+# Block World - player / zombie / drop helpers
+# entities are plain dicts (they go into saves as-is):
+#   zombie: {"x", "y", "hp"}     drop: {"bid", "x", "y"}
+# positions are world pixels, tile = position // blocksize
+# ==========================================
+import math
+
+from blocks import VOID, SOLID_BLOCKS
+from config import blocksize, ITEM_PICKUP_RADIUS
+
+
+def point_solid(world, x, y):
+    bid = world.get(int(y // blocksize), int(x // blocksize))
+    return bid == VOID or (bid in SOLID_BLOCKS)
+
+
+def box_solid(world, x, y, hitbox):
+    # any corner of a hitbox x hitbox square centred on (x, y)
+    h = hitbox // 2 - 1
+    for ox, oy in [(-h, -h), (h, -h), (-h, h), (h, h)]:
+        if point_solid(world, x + ox, y + oy):
+            return True
+    return False
+
+
+def find_safe_spawn(world, start_px, start_py, max_radius_tiles=20):
+    # centre of the nearest open tile, searching outwards in squares
+    start_r = int(start_py // blocksize)
+    start_c = int(start_px // blocksize)
+
+    for radius in range(max_radius_tiles + 1):
+        for dr in range(-radius, radius + 1):
+            for dc in range(-radius, radius + 1):
+                r = start_r + dr
+                c = start_c + dc
+                if world.in_bounds(r, c):
+                    bid = world.get(r, c)
+                    if bid != VOID and bid not in SOLID_BLOCKS:
+                        x = c * blocksize + blocksize / 2
+                        y = r * blocksize + blocksize / 2
+                        if not point_solid(world, x, y):
+                            return x, y
+    return blocksize, blocksize
+
+
+def new_zombie(x, y, hp):
+    return {"x": float(x), "y": float(y), "hp": int(hp)}
+
+
+def new_drop(bid, x, y):
+    return {"bid": bid, "x": float(x), "y": float(y)}
+
+
+def pick_up_drops(drops, x, y, inventory):
+    # moves every drop within ITEM_PICKUP_RADIUS of (x, y) into the inventory
+    kept = []
+    for it in drops:
+        dx = x - it["x"]
+        dy = y - it["y"]
+        if abs(dx) <= ITEM_PICKUP_RADIUS and abs(dy) <= ITEM_PICKUP_RADIUS and math.hypot(dx, dy) <= ITEM_PICKUP_RADIUS:
+            inventory[it["bid"]] = inventory.get(it["bid"], 0) + 1
+        else:
+            kept.append(it)
+    if len(kept) != len(drops):
+        drops[:] = kept
@@ -0,0 +1,357 @@
+# ==========================================
+# Block World - dirt patch tracking
+# ==========================================
+from collections import Counter
+
+import numpy as np
+
+from blocks import DIRT
+from world import CHUNK_SIZE, CHUNK_SHIFT, CHUNK_MASK, CHUNK_AREA
+
+
+def connected_blobs(mask):
+    # 4-connected components of a boolean array as lists of (r, c),
+    # row-major, ordered by their first cell. works on the runs of set
+    # cells along each row: runs in neighbouring rows that share a
+    # column are joined, union-find over runs rather than cells
+    h, w = mask.shape
+    edges = np.zeros((h, w + 2), dtype=np.int8)
+    edges[:, 1:-1] = mask
+    edges = np.diff(edges, axis=1)
+    rows, starts = (a.tolist() for a in np.nonzero(edges == 1))
+    ends = np.nonzero(edges == -1)[1].tolist()
+    if not rows:
+        return []
+
+    # a run's root is the first run of its blob
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    p = 0   # first run of the row above that can still touch this one
+    for k, (r, s, e) in enumerate(zip(rows, starts, ends)):
+        while p < k and (rows[p] < r - 1 or (rows[p] == r - 1 and ends[p] <= s)):
+            p += 1
+        q = p
+        while q < k and rows[q] == r - 1 and starts[q] < e:
+            a, b = find(q), find(k)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+            q += 1
+
+    # label every cell with its run's root, then group the cells (row-major)
+    # by label; roots are in first-cell order, so the blobs come out sorted
+    labels = np.repeat([find(k) for k in range(len(rows))], np.subtract(ends, starts))
+    rs, cs = np.nonzero(mask)
+    order = np.argsort(labels, kind="stable")
+    cells = list(zip(rs[order].tolist(), cs[order].tolist()))
+    bounds = np.flatnonzero(np.diff(labels[order])) + 1
+    return [cells[i:j] for i, j in zip([0] + bounds.tolist(), bounds.tolist() + [len(cells)]) if j > i]
+
+
+def _median(counts):
+    # the middle value (index n // 2) of a sorted list given as (value, count) pairs
+    counts = sorted(counts)
+    k = sum(n for _, n in counts) // 2
+    for value, n in counts:
+        if k < n:
+            return value
+        k -= n
+
+
+def chunk_blobs(masks):
+    # connected_blobs of each of a list of (16, 16) masks, in one pass:
+    # the masks are stacked with a blank row between them
+    stride = CHUNK_SIZE + 1
+    stack = np.zeros((len(masks), stride, CHUNK_SIZE), dtype=bool)
+    for n, mask in enumerate(masks):
+        stack[n, :CHUNK_SIZE] = mask
+    out = [[] for _ in masks]
+    for blob in connected_blobs(stack.reshape(-1, CHUNK_SIZE)):
+        n = blob[0][0] // stride
+        top = n * stride
+        out[n].append([(r - top, c) for r, c in blob])
+    return out
+
+
+def _labels(blobs):
+    # a chunk's labels: blob number (from 1) per tile, 0 for no dirt
+    labels = bytearray(CHUNK_AREA)
+    for label, cells in enumerate(blobs, 1):
+        for i, j in cells:
+            labels[(i << CHUNK_SHIFT) | j] = label
+    return labels
+
+
+class Piece:
+    # one blob of dirt inside one chunk
+    __slots__ = ("patch", "key", "label", "size", "first", "rows", "cols")
+
+    def __init__(self, key, label, cells):
+        top, left = key[0] << CHUNK_SHIFT, key[1] << CHUNK_SHIFT
+        self.patch = None
+        self.key = key
+        self.label = label
+        self.size = len(cells)
+        self.first = (cells[0][0] + top, cells[0][1] + left)
+        # (value, count) pairs, for the median
+        self.rows = tuple((i + top, n) for i, n in Counter(i for i, _ in cells).items())
+        self.cols = tuple((j + left, n) for j, n in Counter(j for _, j in cells).items())
+
+
+# ==========================================================
+# DIRT PATCHES
+# a patch is a 4-connected set of DIRT tiles (anywhere in the
+# world) with a stable id and a spawn cell: median row, median
+# col. tiles are grouped per chunk into pieces, the chunk's own
+# blobs, and a patch is a set of pieces that touch across chunk
+# edges. an edit relabels only its chunk, then re-forms the
+# patches that had a piece there or touch a new one: the
+# biggest old patch keeps its id, on the part holding most of it.
+# spawn_cells (id -> (r, c)) always matches the current tiles, and
+# on_patch_changed listeners hear about every change to it.
+#
+# a chunk out of memory keeps its pieces and only the labels on
+# its four edges (unload_chunk); reload_chunk labels its tiles
+# again, which can't have changed meanwhile.
+# ==========================================================
+class DirtPatches:
+    def __init__(self):
+        self.chunks = {}        # chunk -> [piece ids (label - 1 -> id), labels or None, edges or None]
+        self.pieces = {}        # piece id -> Piece
+        self.patch_pieces = {}  # patch id -> {piece id}
+        self.spawn_cells = {}   # patch id -> spawn cell
+        self.next_id = 0
+        self.next_piece = 0
+        self.on_patch_changed = []  # callbacks(patch id, spawn cell, or None once it's gone)
+
+    def clear(self):
+        self.chunks.clear()
+        self.pieces.clear()
+        self.patch_pieces.clear()
+        self.spawn_cells.clear()
+        self.next_id = 0
+        self.next_piece = 0
+
+    def _set_spawn(self, pid, cell):
+        if cell is None:
+            del self.spawn_cells[pid]
+        else:
+            self.spawn_cells[pid] = cell
+        for fn in self.on_patch_changed:
+            fn(pid, cell)
+
+    def _size(self, pid):
+        return sum(self.pieces[p].size for p in self.patch_pieces[pid])
+
+    def _edges(self, key):
+        # top row, bottom row, left col, right col of a chunk's labels
+        ids, labels, edges = self.chunks[key]
+        if labels is None:
+            return edges
+        return labels[:CHUNK_SIZE], labels[-CHUNK_SIZE:], labels[::CHUNK_SIZE], labels[CHUNK_MASK::CHUNK_SIZE]
+
+    def _linked(self, p):
+        # pieces of the four neighbouring chunks that touch piece p
+        piece = self.pieces[p]
+        cr, cc = piece.key
+        label = piece.label
+        top, bottom, left, right = self._edges(piece.key)
+        out = []
+        for edge, key, side in ((top, (cr - 1, cc), 1), (bottom, (cr + 1, cc), 0),
+                                (left, (cr, cc - 1), 3), (right, (cr, cc + 1), 2)):
+            if label not in edge or key not in self.chunks:
+                continue
+            ids = self.chunks[key][0]
+            other = self._edges(key)[side]
+            for i in range(CHUNK_SIZE):
+                if edge[i] == label and other[i]:
+                    out.append(ids[other[i] - 1])
+        return out
+
+    def patch_of(self, cell):
+        # id of the patch holding a tile (its chunk must be in memory), else None
+        r, c = cell
+        rec = self.chunks.get((r >> CHUNK_SHIFT, c >> CHUNK_SHIFT))
+        if rec is None or rec[1] is None:
+            return None
+        label = rec[1][((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK)]
+        return self.pieces[rec[0][label - 1]].patch if label else None
+
+    def set_chunks(self, masks):
+        # masks: chunk -> (16, 16) bools, the dirt of chunks in memory.
+        # relabels those chunks, then re-forms the patches that changed
+        pieces = self.pieces
+        old = {}        # old patch id -> its size before
+        for key in masks:
+            for p in self.chunks.get(key, ((),))[0]:
+                pid = pieces[p].patch
+                if pid not in old:
+                    old[pid] = self._size(pid)
+
+        held = {}       # new piece -> {old patch id: its tiles the piece holds}
+        new = []
+        for key, blobs in zip(masks, chunk_blobs(list(masks.values()))):
+            ids, labels, _ = self.chunks.pop(key, ((), None, None))
+            was = []
+            for p in ids:
+                piece = pieces.pop(p)
+                self.patch_pieces[piece.patch].discard(p)
+                was.append(piece.patch)
+            if not blobs:
+                continue
+            ids = []
+            for label, cells in enumerate(blobs, 1):
+                p = self.next_piece
+                self.next_piece += 1
+                pieces[p] = Piece(key, label, cells)
+                took = held[p] = {}
+                if labels is not None:
+                    for i, j in cells:
+                        n = labels[(i << CHUNK_SHIFT) | j]
+                        if n:
+                            took[was[n - 1]] = took.get(was[n - 1], 0) + 1
+                ids.append(p)
+            self.chunks[key] = [ids, _labels(blobs), None]
+            new.extend(ids)
+
+        # patches the new pieces touch join in
+        links = {p: self._linked(p) for p in new}
+        for qs in links.values():
+            for q in qs:
+                pid = pieces[q].patch
+                if pid is not None and pid not in old:
+                    old[pid] = self._size(pid)
+
+        # connected groups of the new pieces and what's left of the old patches
+        todo = set(new)
+        for pid in old:
+            todo.update(self.patch_pieces[pid])
+        groups = []
+        while todo:
+            group = [todo.pop()]
+            stack = group[:]
+            while stack:
+                p = stack.pop()
+                for q in links[p] if p in links else self._linked(p):
+                    if q in todo:
+                        todo.discard(q)
+                        group.append(q)
+                        stack.append(q)
+            groups.append(group)
+        groups.sort(key=lambda group: min(pieces[p].first for p in group))
+
+        # how many tiles of each old patch every group holds
+        weights = []
+        for group in groups:
+            w = {}
+            for p in group:
+                piece = pieces[p]
+                if piece.patch is None:
+                    for pid, n in held[p].items():
+                        w[pid] = w.get(pid, 0) + n
+                else:
+                    w[piece.patch] = w.get(piece.patch, 0) + piece.size
+            weights.append(w)
+
+        # biggest old patch first, each keeps its id on the group holding
+        # most of it; the rest are gone, and groups left over are new patches
+        owner = {}
+        for pid in sorted(old, key=lambda q: (-old[q], q)):
+            best = None
+            for i, w in enumerate(weights):
+                if i not in owner and w.get(pid, 0) > (weights[best][pid] if best is not None else 0):
+                    best = i
+            if best is None:
+                del self.patch_pieces[pid]
+                self._set_spawn(pid, None)
+            else:
+                owner[best] = pid
+        for i, group in enumerate(groups):
+            pid = owner.get(i)
+            if pid is None:
+                pid = self.next_id
+                self.next_id += 1
+            for p in group:
+                pieces[p].patch = pid
+            self.patch_pieces[pid] = set(group)
+            cell = (_median(n for p in group for n in pieces[p].rows),
+                    _median(n for p in group for n in pieces[p].cols))
+            if self.spawn_cells.get(pid) != cell:
+                self._set_spawn(pid, cell)
+
+    def tile_changed(self, r, c, old, new):
+        if (old == DIRT) == (new == DIRT):
+            return
+        key = (r >> CHUNK_SHIFT, c >> CHUNK_SHIFT)
+        rec = self.chunks.get(key)
+        if rec is None:
+            mask = np.zeros(CHUNK_AREA, dtype=bool)
+        else:
+            mask = np.frombuffer(rec[1], dtype=np.uint8) > 0
+        mask[((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK)] = new == DIRT
+        self.set_chunks({key: mask.reshape(CHUNK_SIZE, CHUNK_SIZE)})
+
+    # ------------------------------------------------------
+    # chunks out of memory (patches and spawn cells stay)
+    # ------------------------------------------------------
+    def unload_chunk(self, key):
+        rec = self.chunks.get(key)
+        if rec is not None and rec[1] is not None:
+            rec[2] = tuple(bytes(edge) for edge in self._edges(key))
+            rec[1] = None
+
+    def reload_chunk(self, key, mask):
+        # mask: the chunk's dirt. same tiles, so the same blobs in the
+        # same order: label i is still piece ids[i - 1]
+        rec = self.chunks.get(key)
+        if rec is None or rec[1] is not None:
+            return
+        blobs = connected_blobs(mask)
+        if len(blobs) != len(rec[0]):
+            self.set_chunks({key: mask})
+            return
+        rec[1] = _labels(blobs)
+        rec[2] = None
+
+    # ------------------------------------------------------
+    # saving: a patch by its first tile. the tables are rebuilt from
+    # the tiles on load, then load() hands the saved ids back
+    # ------------------------------------------------------
+    def to_save(self):
+        firsts = {}
+        for piece in self.pieces.values():
+            if piece.patch not in firsts or piece.first < firsts[piece.patch]:
+                firsts[piece.patch] = piece.first
+        return {"patches": firsts, "next_id": self.next_id}
+
+    def load(self, data):
+        # saves from before pieces stored every tile of a patch
+        saved = {}
+        for pid, cell in data["patches"].items():
+            if cell and not isinstance(cell[0], int):
+                cell = min(tuple(q) for q in cell)
+            saved[tuple(cell)] = pid
+        now = {}
+        for piece in self.pieces.values():
+            pid = saved.get(piece.first)
+            if pid is not None and piece.patch not in now:
+                now[piece.patch] = pid
+        self.next_id = max([data["next_id"]] + [pid + 1 for pid in now.values()])
+        for pid in sorted(self.patch_pieces):
+            if pid not in now:
+                now[pid] = self.next_id
+                self.next_id += 1
+
+        patch_pieces, spawn_cells = self.patch_pieces, self.spawn_cells
+        self.patch_pieces = {}
+        self.spawn_cells = {}
+        for pid in sorted(patch_pieces, key=now.get):
+            self.patch_pieces[now[pid]] = patch_pieces[pid]
+            self.spawn_cells[now[pid]] = spawn_cells[pid]
+            for p in patch_pieces[pid]:
+                self.pieces[p].patch = now[pid]
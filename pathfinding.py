@@ -0,0 +1,149 @@
+# ==========================================
+# Block World - zombie pathfinding
+# ==========================================
+import numpy as np
+
+from blocks import VOID, SOLID_BLOCKS
+
+STRAIGHT = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+DIAGONAL = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def walkable(bid):
+    return (bid != VOID) and (bid not in SOLID_BLOCKS)
+
+
+def can_step(world, tr, tc):
+    return walkable(world.get(tr, tc))
+
+
+# walkable() for every block id, so a whole rect is one lookup
+WALKABLE = np.array([walkable(bid) for bid in range(256)], dtype=np.uint8)
+
+
+# ==========================================================
+# DISTANCE MAP
+# BFS step counts out from the player's tile, inside a square of
+# `radius` tiles around it. with diagonals (hard mode) a diagonal
+# step needs both of the straight tiles beside it to be open.
+# runs on one rect read of the square plus a closed 1-tile frame,
+# as flat indices, so no bounds checks or per-tile world reads.
+# ==========================================================
+def build_dist_map(world, pr, pc, radius, diagonal=False):
+    top = pr - radius
+    bot = pr + radius
+    left = pc - radius
+    right = pc + radius
+    if not world.infinite:
+        top, left = max(0, top), max(0, left)
+        bot, right = min(world.rows - 1, bot), min(world.cols - 1, right)
+
+    if not can_step(world, pr, pc):
+        return {}
+
+    h, w = bot - top + 3, right - left + 3
+    grid = bytearray(WALKABLE[world.rect(top - 1, left - 1, h, w)].tobytes())
+    grid[:w] = bytes(w)
+    grid[-w:] = bytes(w)
+    grid[::w] = bytes(h)
+    grid[w - 1::w] = bytes(h)
+
+    straight = [dr * w + dc for dr, dc in STRAIGHT]
+    # (step, and the two straight steps it cuts between)
+    diagonal_steps = [(dr * w + dc, dr * w, dc) for dr, dc in DIAGONAL] if diagonal else []
+
+    start = (pr - top + 1) * w + (pc - left + 1)
+    seen = bytearray(len(grid))
+    seen[start] = 1
+    cells = [start]
+    dists = [0]
+    limit = radius * 2
+    i = 0
+    while i < len(cells):
+        cur = cells[i]
+        base = dists[i]
+        i += 1
+        if base >= limit:
+            continue
+
+        for step in straight:
+            n = cur + step
+            if grid[n] and not seen[n]:
+                seen[n] = 1
+                cells.append(n)
+                dists.append(base + 1)
+        for step, a, b in diagonal_steps:
+            n = cur + step
+            if grid[n] and not seen[n] and grid[cur + a] and grid[cur + b]:
+                seen[n] = 1
+                cells.append(n)
+                dists.append(base + 1)
+
+    top, left = top - 1, left - 1
+    d = {}
+    for n, dd in zip(cells, dists):
+        r, c = divmod(n, w)
+        d[(top + r, left + c)] = dd
+    return d
+
+
+# ==========================================================
+# NEXT STEP
+# the neighbouring tile a zombie at (zr, zc) should head for. in
+# normal mode it prefers lining up with the player on the axis the
+# player last moved along, so zombies don't zig-zag.
+# ==========================================================
+def choose_next_cell(world, dist_map, zr, zc, pr, pc, diagonal=False, player_axis="x"):
+    if not dist_map:
+        return None
+    if (zr, zc) not in dist_map:
+        return None
+
+    here = dist_map[(zr, zc)]
+    best_cell = None
+    best_dist = here
+
+    if diagonal:
+        neighbors = STRAIGHT + DIAGONAL
+    elif player_axis == "x":
+        neighbors = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    else:
+        neighbors = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+    for dr, dc in neighbors:
+        rr, cc = zr + dr, zc + dc
+        if (rr, cc) not in dist_map:
+            continue
+
+        if diagonal and dr != 0 and dc != 0:
+            if not can_step(world, zr + dr, zc) or not can_step(world, zr, zc + dc):
+                continue
+
+        dd = dist_map[(rr, cc)]
+        if dd < best_dist:
+            best_dist = dd
+            best_cell = (rr, cc)
+
+    if not diagonal:
+        axis_target = None
+        if player_axis == "x" and zr != pr:
+            cand = []
+            for rr, cc in [(zr - 1, zc), (zr + 1, zc)]:
+                if (rr, cc) in dist_map and dist_map[(rr, cc)] < dist_map[(zr, zc)]:
+                    cand.append((rr, cc))
+            if cand:
+                cand.sort(key=lambda t: abs(t[0] - pr))
+                axis_target = cand[0]
+        elif player_axis == "y" and zc != pc:
+            cand = []
+            for rr, cc in [(zr, zc - 1), (zr, zc + 1)]:
+                if (rr, cc) in dist_map and dist_map[(rr, cc)] < dist_map[(zr, zc)]:
+                    cand.append((rr, cc))
+            if cand:
+                cand.sort(key=lambda t: abs(t[1] - pc))
+                axis_target = cand[0]
+
+        if axis_target is not None:
+            best_cell = axis_target
+
+    return best_cell
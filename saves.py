@@ -0,0 +1,25 @@
+# ==========================================
+# Block World - save slots
+# ==========================================
+import os
+import pickle
+
+SAVE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def save_game(slot, data):
+    path = os.path.join(SAVE_DIR, f"save_slot_{slot}.dat")
+    with open(path, "wb") as f:
+        pickle.dump(data, f)
+
+
+def load_game(slot):
+    path = os.path.join(SAVE_DIR, f"save_slot_{slot}.dat")
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def save_exists(slot):
+    return os.path.exists(os.path.join(SAVE_DIR, f"save_slot_{slot}.dat"))
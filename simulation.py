@@ -0,0 +1,857 @@
+# ==========================================
+# Block World - game simulation
+# one game minus the window: world, player, zombies, drops and the
+# day/night cycle, advanced one fixed tick (one frame at FPS) at a
+# time. no pygame here, so it can run headless and as fast as it likes
+# ==========================================
+import heapq
+import math
+import random
+
+import numpy as np
+
+from blocks import BLOCKS, VOID, GRASS, DIRT, WOOD, LEAVES, STONE, BRICK, CORE, SOLID_BLOCKS
+from world import CHUNK_SIZE, CHUNK_SHIFT, CHUNK_MASK, REGION_TILES, ChunkBitset
+from worldgen import generate_world, load_world
+from templates import find_template
+from patches import DirtPatches
+from config import (
+    GAME_VERSION, FPS, blocksize, screen_width, view_height, base_rows, base_cols, world_rows, world_cols,
+    CHUNK_BUDGET, DELETE, player_speed, HITBOX_SIZE, ZOMBIE_HITBOX, CORE_MINE_TIME,
+    DAY_FRAMES, CYCLE_FRAMES, MAX_HEALTH, HEAL_DELAY_FRAMES, HEAL_TICK_FRAMES, HEAL_AMOUNT,
+    RESPAWN_IMMUNITY_FRAMES, ZOMBIE_DAMAGE_COOLDOWN, MAX_ZOMBIES_TOTAL, PATH_RADIUS_TILES, PATH_UPDATE_FRAMES,
+    HOUSE_RESPAWN_SECONDS, NORMAL_DIRT_SPAWN, HARD_DIRT_SPAWN, NORMAL_HOUSE_SPAWN, HARD_HOUSE_SPAWN,
+    NORMAL_ZOMBIE_HITS, HARD_ZOMBIE_HITS, NORMAL_ZOMBIE_SPEED_FACTOR, HARD_ZOMBIE_SPEED_FACTOR, HARD_DAMAGE_MULT,
+    BLOOD_MOON_CHANCE_NORMAL, BLOOD_MOON_CHANCE_HARD, BLOOD_MOON_DAMAGE_MULT, BLOOD_MOON_Z_SPEED_FACTOR,
+    ALTAR_BROKEN_PAUSE_FRAMES, ALTAR_ZOMBIE_SPEED_MULT,
+)
+from pathfinding import walkable, build_dist_map, choose_next_cell
+from entities import box_solid, find_safe_spawn, new_zombie, new_drop, pick_up_drops
+
+MINE_TIME = 45
+MINEABLE = {DIRT, WOOD, LEAVES, STONE, BRICK, CORE}
+
+# chunks count as seen once they come within this many tiles of the
+# view; they're generated a chunk before they scroll into it
+CHUNK_VISIBILITY_MARGIN_TILES = 2
+CHUNK_PREFETCH_MARGIN_TILES = CHUNK_SIZE
+SPAWN_CHECK_FRAMES = 20
+
+
+def mineable(bid):
+    return bid in MINEABLE
+
+
+def tile_to_chunk(tr, tc):
+    return (tr // CHUNK_SIZE, tc // CHUNK_SIZE)
+
+
+class Simulation:
+    def __init__(self, world, altar_pos, mode="survival", preset="normal", difficulty="normal", rng=None):
+        self.mode = mode
+        self.preset = preset
+        self.difficulty = difficulty
+        self.hard = hard = (difficulty == "hard")
+        # the global random module unless a game wants its own stream
+        self.rng = rng if rng is not None else random
+
+        self.zombie_speed_factor = HARD_ZOMBIE_SPEED_FACTOR if hard else NORMAL_ZOMBIE_SPEED_FACTOR
+        self.zombie_hits_to_kill = HARD_ZOMBIE_HITS if hard else NORMAL_ZOMBIE_HITS
+        self.dirt_spawn_chance = HARD_DIRT_SPAWN if hard else NORMAL_DIRT_SPAWN
+        self.house_spawn_chance = HARD_HOUSE_SPAWN if hard else NORMAL_HOUSE_SPAWN
+        self.damage_mult = HARD_DAMAGE_MULT if hard else 1.0
+        self.house_period_frames = int(HOUSE_RESPAWN_SECONDS * FPS)
+
+        self.world = world
+        self.altar_pos = altar_pos
+        self.frame = 0
+
+        # player
+        self.inventory = {bid: 0 for bid in BLOCKS.keys()}
+        px = (world.cols * blocksize) // 2
+        py = (world.rows * blocksize) // 2
+        self.px, self.py = find_safe_spawn(world, px, py)
+        self.respawn_x, self.respawn_y = self.px, self.py
+        self.selected_block = DELETE if mode == "survival" else GRASS
+        self.last_player_axis = "x"
+
+        self.health = float(MAX_HEALTH)
+        self.damage_timer = 0
+        self.frames_since_damage = 999999
+        self.heal_tick_timer = 0
+        self.invuln_timer = RESPAWN_IMMUNITY_FRAMES if mode == "survival" else 0
+
+        # mining
+        self.mine_target = None
+        self.mine_progress = 0
+        self.mining = False
+
+        # altar
+        self.altar_broken = False
+        self.altar_pause_timer = 0
+
+        # day/night
+        self.cycle_frame = 0
+        self.is_night = False
+        self.blood_moon = False
+
+        self.zombies = []
+        self.dropped_items = []  # each: {"bid":id,"x":float,"y":float}
+
+        # structures: dirt patches follow every tile edit (set_block
+        # events); patch ids are stable, and kept in saves
+        self.dirt_patches = DirtPatches()
+        self.dirt_patches.on_patch_changed.append(self.dirt_patch_changed)
+        self.houses = []
+        self.house_spawn_cells = []
+        self.house_wood_tiles = []
+        # a house spawns while any of its wood tiles is left; kept up to
+        # date from set_block events instead of re-reading the tiles
+        self.house_wood_left = []
+        self.house_of_wood_tile = {}    # only for chunks in memory
+        self.chunk_houses = {}          # chunk -> {house index} with a wood tile in it
+        self.active_houses = set()
+        # house spawners keyed by next spawn frame. each one is in exactly
+        # one of: house_heap, dormant_houses (no wood left) or parked_houses
+        # (due, but its chunk hasn't been seen yet)
+        self.house_heap = []
+        self.dormant_houses = set()
+        self.parked_houses = {}     # chunk -> [house index]
+        self.house_next_spawn_frame = []
+        # houses from the registry waiting for the regions their spawn ring reaches into
+        self.registered_regions = set()
+        self.waiting_structures = {}     # (region, index) -> [entry, regions still missing]
+        self.structures_waiting_on = {}  # region -> [(region, index)]
+
+        # spawns only come from chunks the player has seen. dirt patches
+        # are indexed by the chunk of their spawn cell: a patch gets its
+        # one roll when that chunk is first seen, or when it shows up in
+        # a chunk that already was
+        self.seen_chunks = ChunkBitset()
+        self.dirt_spawned = set()
+        self.dirt_patches_by_chunk = {}  # chunk -> {patch id}
+        self.dirt_patch_chunk = {}       # patch id -> chunk
+        self.pending_dirt = set()        # patch ids to roll at the next spawn check
+
+        # zombie pathfinding
+        self.dist_map = {}
+        self.dist_origin = None     # player tile dist_map was built from
+        self.dist_stale = True      # a walkable tile changed inside its window
+        # tiles around dist_origin, copied out once per rebuild; the BFS,
+        # next steps and collision read these (see TileWindow)
+        self.near_tiles = None
+
+        self.attach_world()
+
+    @classmethod
+    def generate(cls, mode="survival", preset="normal", difficulty="normal", seed=None, infinite=False,
+                 rows=world_rows, cols=world_cols, rng=None):
+        # a fresh world; its regions are generated as the player gets near them
+        world, altar_pos = generate_world(preset, difficulty, rows, cols, seed=seed, infinite=infinite,
+                                          chunk_budget=CHUNK_BUDGET if infinite else None)
+        return cls(world, altar_pos, mode, preset, difficulty, rng)
+
+    # ======================================================
+    # -------- STRUCTURE DETECTION (PATCHES / HOUSES) -------
+    # runs once per generated region (regions are generated
+    # lazily). a house can stick out into the regions next to
+    # its own, so its entry waits until all of them are in
+    # ======================================================
+    def add_dirt(self, top, left, mask):
+        # dirt of a rect at (top, left) on chunk bounds, as a bool array
+        blocks = mask.reshape(mask.shape[0] >> CHUNK_SHIFT, CHUNK_SIZE, mask.shape[1] >> CHUNK_SHIFT, CHUNK_SIZE)
+        blocks = blocks.swapaxes(1, 2)
+        cr0, cc0 = top >> CHUNK_SHIFT, left >> CHUNK_SHIFT
+        rows, cols = (a.tolist() for a in np.nonzero(blocks.any(axis=(2, 3))))
+        self.dirt_patches.set_chunks({(cr0 + i, cc0 + j): blocks[i, j] for i, j in zip(rows, cols)})
+
+    def find_dirt_patches(self, top, left, height, width):
+        # for saves without a registry: look for it (tiles past the world's edge aren't dirt)
+        height = (height + CHUNK_MASK) & ~CHUNK_MASK
+        width = (width + CHUNK_MASK) & ~CHUNK_MASK
+        self.add_dirt(top, left, self.world.rect(top, left, height, width) == DIRT)
+
+    def find_houses(self, top, left, height, width):
+        return find_template("house", self.world.rect(top, left, height, width), top, left)
+
+    def locate_altar(self, fallback):
+        # saves from before altar_pos was stored: ask the registry, else look for the ring
+        world = self.world
+        for entries in world.structures.values():
+            for kind, r, c, h, w in entries:
+                if kind == "altar":
+                    return r + 2, c + 2
+        if not world.infinite:
+            hits = find_template("altar", world.rect(0, 0, world.rows, world.cols))
+            if hits:
+                return hits[0][0] + 2, hits[0][1] + 2
+        return fallback
+
+    def add_house(self, r, c):
+        world = self.world
+        candidates = [
+            (r - 1, c + 1), (r - 1, c + 2),
+            (r + 4, c + 1), (r + 4, c + 2),
+            (r + 1, c - 1), (r + 2, c - 1),
+            (r + 1, c + 4), (r + 2, c + 4),
+        ]
+        chosen = None
+        for rr, cc in candidates:
+            if world.in_bounds(rr, cc):
+                bid = world.get(rr, cc)
+                if bid != VOID and bid not in SOLID_BLOCKS:
+                    chosen = (rr, cc)
+                    break
+        if chosen is None:
+            chosen = (r + 1, c + 1)
+        self.houses.append((r, c))
+        self.house_spawn_cells.append(chosen)
+        wood_tiles = [(r + 1, c + 1), (r + 1, c + 2), (r + 2, c + 1), (r + 2, c + 2)]
+        i = len(self.house_wood_tiles)
+        self.house_wood_tiles.append(wood_tiles)
+        self.house_wood_left.append(sum(1 for rr, cc in wood_tiles if world.get(rr, cc) == WOOD))
+        for tile in wood_tiles:
+            self.house_of_wood_tile[tile] = i
+            self.chunk_houses.setdefault(tile_to_chunk(*tile), set()).add(i)
+        if self.house_wood_left[i]:
+            self.active_houses.add(i)
+            heapq.heappush(self.house_heap, (0, i))
+        else:
+            self.dormant_houses.add(i)
+        self.house_next_spawn_frame.append(0)
+
+    def scan_region(self, top, left, height, width):
+        # regions from saves made before the structure registry
+        self.find_dirt_patches(top, left, height, width)
+        for (r, c) in self.find_houses(top, left, height, width):
+            self.add_house(r, c)
+
+    def regions_touched(self, r, c, h, w):
+        world = self.world
+        bottom, right = r + h, c + w
+        if not world.infinite:
+            r, c = max(r, 0), max(c, 0)
+            bottom, right = min(bottom, world.rows), min(right, world.cols)
+        return [(rr, rc) for rr in range(r // REGION_TILES, (bottom - 1) // REGION_TILES + 1)
+                for rc in range(c // REGION_TILES, (right - 1) // REGION_TILES + 1)]
+
+    def register_structures(self, structures):
+        # same tables and order as scan_region, straight from worldgen's registry
+        for kind, r, c, h, w in sorted(structures, key=lambda s: (s[1], s[2])):
+            if kind == "house":
+                self.add_house(r, c)
+
+    def region_generated(self, top, left, height, width, structures):
+        key = (top // REGION_TILES, left // REGION_TILES)
+        self.registered_regions.add(key)
+        if structures is None:
+            self.scan_region(top, left, height, width)
+            return
+
+        # the region's dirt rects join the patches they touch around it
+        mask = np.zeros((REGION_TILES, REGION_TILES), dtype=bool)
+        for kind, r, c, h, w in structures:
+            if kind == "dirt":
+                mask[r - top:r - top + h, c - left:c - left + w] = True
+            elif kind == "soil":
+                # saves from before the registry had dirt rects
+                mask |= self.world.rect(top, left, REGION_TILES, REGION_TILES) == DIRT
+        self.add_dirt(top, left, mask)
+
+        # houses whose tiles (spawn ring included) are all generated
+        # now: this region's own, and ones that were waiting on it
+        ready = []
+        for i, entry in enumerate(structures):
+            kind, r, c, h, w = entry
+            if kind != "house":
+                continue
+            missing = [k for k in self.regions_touched(r - 1, c - 1, h + 2, w + 2) if k not in self.registered_regions]
+            if missing:
+                self.waiting_structures[key, i] = [entry, len(missing)]
+                for k in missing:
+                    self.structures_waiting_on.setdefault(k, []).append((key, i))
+            else:
+                ready.append(entry)
+        for ref in self.structures_waiting_on.pop(key, ()):
+            waiting = self.waiting_structures[ref]
+            waiting[1] -= 1
+            if not waiting[1]:
+                ready.append(self.waiting_structures.pop(ref)[0])
+        self.register_structures(ready)
+
+    def attach_world(self):
+        # (re)build the structure tables for the current world, keep them
+        # up to date as new regions get generated, and listen for edits
+        world = self.world
+        for table in (self.houses, self.house_spawn_cells, self.house_wood_tiles, self.house_next_spawn_frame,
+                      self.house_wood_left, self.house_of_wood_tile, self.chunk_houses, self.active_houses,
+                      self.house_heap, self.dormant_houses, self.parked_houses):
+            table.clear()
+        self.dirt_patches.clear()
+        self.registered_regions.clear()
+        self.waiting_structures.clear()
+        self.structures_waiting_on.clear()
+        regions = list(world.generated_regions)
+        if not world.infinite and regions and not any(key in world.structures for key in regions):
+            # saves from before the structure registry: one scan of the
+            # whole world, so patches and houses come out in row-major
+            # order, the same indices as dirt_spawned and house_next_spawn_frame
+            self.registered_regions.update(regions)
+            self.scan_region(0, 0, world.rows, world.cols)
+        else:
+            for rr, rc in regions:
+                self.region_generated(*world.region_bounds(rr, rc), world.structures.get((rr, rc)))
+        world.on_region_generated.append(self.region_generated)
+        world.on_chunk_unloaded.append(self.chunk_unloaded)
+        world.on_chunk_reloaded.append(self.chunk_reloaded)
+        world.on_block_changed.append(self.dirt_patches.tile_changed)
+        world.on_block_changed.append(self.path_tile_changed)
+        world.on_block_changed.append(self.near_tile_changed)
+        self.near_tiles = world.window(0, 0, 0, 0)
+        world.on_block_changed.append(self.house_tile_changed)
+        self.reset_dirt_index()
+
+    def chunk_unloaded(self, cr, cc):
+        # the world dropped a chunk: drop its per-tile entries too.
+        # patches, spawn cells and house spawners stay
+        key = (cr, cc)
+        self.dirt_patches.unload_chunk(key)
+        for i in self.chunk_houses.get(key, ()):
+            for tile in self.house_wood_tiles[i]:
+                if tile_to_chunk(*tile) == key:
+                    self.house_of_wood_tile.pop(tile, None)
+
+    def chunk_reloaded(self, cr, cc):
+        key = (cr, cc)
+        tiles = self.world.rect(cr << CHUNK_SHIFT, cc << CHUNK_SHIFT, CHUNK_SIZE, CHUNK_SIZE)
+        self.dirt_patches.reload_chunk(key, tiles == DIRT)
+        for i in self.chunk_houses.get(key, ()):
+            for tile in self.house_wood_tiles[i]:
+                if tile_to_chunk(*tile) == key:
+                    self.house_of_wood_tile[tile] = i
+
+    def house_tile_changed(self, r, c, old, new):
+        i = self.house_of_wood_tile.get((r, c))
+        if i is None or (old == WOOD) == (new == WOOD):
+            return
+        self.house_wood_left[i] += 1 if new == WOOD else -1
+        if self.house_wood_left[i]:
+            self.active_houses.add(i)
+            if i in self.dormant_houses:
+                self.dormant_houses.discard(i)
+                heapq.heappush(self.house_heap, (self.house_next_spawn_frame[i], i))
+        else:
+            # left in the heap; it goes dormant when it next comes due
+            self.active_houses.discard(i)
+
+    def reset_house_schedule(self):
+        # after house_next_spawn_frame was replaced (loading)
+        self.house_heap[:] = [(self.house_next_spawn_frame[i], i) for i in self.active_houses]
+        heapq.heapify(self.house_heap)
+        self.dormant_houses.clear()
+        self.dormant_houses.update(i for i in range(len(self.houses)) if i not in self.active_houses)
+        self.parked_houses.clear()
+
+    def release_parked_houses(self, chunks):
+        for key in chunks:
+            for i in self.parked_houses.pop(key, ()):
+                heapq.heappush(self.house_heap, (self.house_next_spawn_frame[i], i))
+
+    # ======================================================
+    # -------- "SEEN CHUNKS" FOR SPAWNS ---------------------
+    # ======================================================
+    def camera(self):
+        # top-left of the view in world pixels, centred on the player
+        # (finite worlds stop scrolling half a screen past the edge)
+        cam_x = self.px - screen_width // 2
+        cam_y = self.py - view_height // 2
+        if not self.world.infinite:
+            world_px_w = self.world.cols * blocksize
+            world_px_h = self.world.rows * blocksize
+            cam_x = max(-screen_width // 2, min(cam_x, world_px_w - screen_width // 2))
+            cam_y = max(-view_height // 2, min(cam_y, world_px_h - view_height // 2))
+        return cam_x, cam_y
+
+    def mark_seen_chunks(self, cam_x, cam_y):
+        # returns the chunks seen for the first time
+        world = self.world
+        start_col = int(cam_x // blocksize) - CHUNK_VISIBILITY_MARGIN_TILES
+        start_row = int(cam_y // blocksize) - CHUNK_VISIBILITY_MARGIN_TILES
+        end_col = start_col + base_cols + 3 + CHUNK_VISIBILITY_MARGIN_TILES * 2
+        end_row = start_row + base_rows + 3 + CHUNK_VISIBILITY_MARGIN_TILES * 2
+
+        if not world.infinite:
+            start_col = max(0, start_col)
+            start_row = max(0, start_row)
+            end_col = min(world.cols - 1, end_col)
+            end_row = min(world.rows - 1, end_row)
+
+        c0 = start_col // CHUNK_SIZE
+        c1 = end_col // CHUNK_SIZE
+        r0 = start_row // CHUNK_SIZE
+        r1 = end_row // CHUNK_SIZE
+
+        newly_seen = []
+        for cr in range(r0, r1 + 1):
+            for cc in range(c0, c1 + 1):
+                if self.seen_chunks.add((cr, cc)):
+                    newly_seen.append((cr, cc))
+        return newly_seen
+
+    def unindex_dirt_patch(self, pid):
+        old = self.dirt_patch_chunk.pop(pid, None)
+        if old is not None:
+            ids = self.dirt_patches_by_chunk[old]
+            ids.discard(pid)
+            if not ids:
+                del self.dirt_patches_by_chunk[old]
+
+    def dirt_patch_changed(self, pid, cell):
+        self.unindex_dirt_patch(pid)
+        if cell is None:
+            self.pending_dirt.discard(pid)
+            return
+        key = tile_to_chunk(*cell)
+        self.dirt_patch_chunk[pid] = key
+        self.dirt_patches_by_chunk.setdefault(key, set()).add(pid)
+        if key in self.seen_chunks and pid not in self.dirt_spawned:
+            self.pending_dirt.add(pid)
+
+    def reset_dirt_index(self):
+        # after dirt_patches, dirt_spawned or seen_chunks were replaced
+        self.dirt_patches_by_chunk.clear()
+        self.dirt_patch_chunk.clear()
+        self.pending_dirt.clear()
+        for pid, cell in self.dirt_patches.spawn_cells.items():
+            self.dirt_patch_changed(pid, cell)
+
+    def chunks_seen(self, chunks):
+        for key in chunks:
+            for pid in self.dirt_patches_by_chunk.get(key, ()):
+                if pid not in self.dirt_spawned:
+                    self.pending_dirt.add(pid)
+        self.release_parked_houses(chunks)
+
+    # ======================================================
+    # ------------------- ZOMBIES ---------------------------
+    # ======================================================
+    def zombie_solid_at(self, x, y):
+        return box_solid(self.near_tiles, x, y, ZOMBIE_HITBOX)
+
+    def spawn_zombie_at_tile(self, tr, tc, hp_override=None):
+        # not on tiles out of memory (they read as VOID)
+        if len(self.zombies) >= MAX_ZOMBIES_TOTAL:
+            return False
+        bid = self.world.peek(tr, tc)
+        if bid == VOID or bid in SOLID_BLOCKS:
+            return False
+        zx = tc * blocksize + blocksize / 2
+        zy = tr * blocksize + blocksize / 2
+        if self.zombie_solid_at(zx, zy):
+            return False
+        hp = int(self.zombie_hits_to_kill) if hp_override is None else int(hp_override)
+        self.zombies.append(new_zombie(zx, zy, hp))
+        return True
+
+    def spawn_from_seen_sources(self):
+        frame_ = self.frame
+        spawn_cells = self.dirt_patches.spawn_cells
+        for i in sorted(self.pending_dirt):
+            tr, tc = spawn_cells[i]
+            if self.rng.random() < self.dirt_spawn_chance:
+                self.spawn_zombie_at_tile(tr, tc)
+            self.dirt_spawned.add(i)
+        self.pending_dirt.clear()
+
+        if self.blood_moon:
+            return
+
+        # only the spawners that are due
+        house_heap = self.house_heap
+        while house_heap and house_heap[0][0] <= frame_:
+            _, i = heapq.heappop(house_heap)
+            if i not in self.active_houses:
+                self.dormant_houses.add(i)
+                continue
+            tr, tc = self.house_spawn_cells[i]
+            if tile_to_chunk(tr, tc) not in self.seen_chunks:
+                self.parked_houses.setdefault(tile_to_chunk(tr, tc), []).append(i)
+                continue
+
+            self.house_next_spawn_frame[i] = frame_ + self.house_period_frames
+            heapq.heappush(house_heap, (self.house_next_spawn_frame[i], i))
+            if self.rng.random() < self.house_spawn_chance:
+                self.spawn_zombie_at_tile(tr, tc)
+
+    def path_tile_changed(self, r, c, old, new):
+        origin = self.dist_origin
+        if origin is None or walkable(old) == walkable(new):
+            return
+        if abs(r - origin[0]) <= PATH_RADIUS_TILES and abs(c - origin[1]) <= PATH_RADIUS_TILES:
+            self.dist_stale = True
+
+    def near_tile_changed(self, r, c, old, new):
+        self.near_tiles.tile_changed(r, c, old, new)
+
+    def rebuild_dist_map(self):
+        pr = int(self.py // blocksize)
+        pc = int(self.px // blocksize)
+        self.dist_origin = (pr, pc)
+        self.dist_stale = False
+        # the BFS square plus the 1-tile frame it reads around it
+        reach = PATH_RADIUS_TILES + 1
+        self.near_tiles = self.world.window(pr - reach, pc - reach, 2 * reach + 1, 2 * reach + 1)
+        self.dist_map = build_dist_map(self.near_tiles, pr, pc, PATH_RADIUS_TILES, diagonal=self.hard)
+
+    def update_zombies(self):
+        px, py = self.px, self.py
+        # only when the player changed tile or the walkable map did
+        if self.frame % PATH_UPDATE_FRAMES == 0 and (
+                self.dist_stale or self.dist_origin != (int(py // blocksize), int(px // blocksize))):
+            self.rebuild_dist_map()
+
+        blood = self.is_night and self.blood_moon
+        speed_mult = ALTAR_ZOMBIE_SPEED_MULT if self.altar_broken else 1.0
+        z_speed = player_speed * speed_mult * (BLOOD_MOON_Z_SPEED_FACTOR if blood else self.zombie_speed_factor)
+
+        pr = int(py // blocksize)
+        pc = int(px // blocksize)
+
+        for z in self.zombies:
+            zr = int(z["y"] // blocksize)
+            zc = int(z["x"] // blocksize)
+
+            vx = px - z["x"]
+            vy = py - z["y"]
+            dist_to_player = math.hypot(vx, vy)
+            if dist_to_player > 0:
+                vx /= dist_to_player
+                vy /= dist_to_player
+
+            best_cell = choose_next_cell(self.near_tiles, self.dist_map, zr, zc, pr, pc, self.hard, self.last_player_axis)
+            if best_cell is not None:
+                tx = best_cell[1] * blocksize + blocksize / 2
+                ty = best_cell[0] * blocksize + blocksize / 2
+                mvx = tx - z["x"]
+                mvy = ty - z["y"]
+                md = math.hypot(mvx, mvy)
+                if md > 0:
+                    vx = mvx / md
+                    vy = mvy / md
+
+            nxz = z["x"] + vx * z_speed
+            nyz = z["y"] + vy * z_speed
+            if not self.zombie_solid_at(nxz, z["y"]):
+                z["x"] = nxz
+            if not self.zombie_solid_at(z["x"], nyz):
+                z["y"] = nyz
+
+            if self.invuln_timer > 0:
+                continue
+
+            dist_now = math.hypot(px - z["x"], py - z["y"])
+            if dist_now < 20 and self.damage_timer == 0 and self.health > 0:
+                dmg_mult = self.damage_mult
+                if blood:
+                    dmg_mult *= BLOOD_MOON_DAMAGE_MULT
+
+                self.health = max(0.0, self.health - (1.0 * dmg_mult))
+                self.damage_timer = ZOMBIE_DAMAGE_COOLDOWN
+                self.frames_since_damage = 0
+                self.heal_tick_timer = 0
+
+    # ======================================================
+    # ---------------- DAY / NIGHT --------------------------
+    # ======================================================
+    def advance_cycle(self):
+        prev_is_night = self.is_night
+
+        self.cycle_frame = (self.cycle_frame + 1) % CYCLE_FRAMES
+        self.is_night = (self.cycle_frame >= DAY_FRAMES)
+
+        if (not prev_is_night) and self.is_night:
+            chance = BLOOD_MOON_CHANCE_HARD if self.hard else BLOOD_MOON_CHANCE_NORMAL
+            self.blood_moon = (self.rng.random() < chance)
+            if self.blood_moon:
+                for (tr, tc) in self.dirt_patches.spawn_cells.values():
+                    self.spawn_zombie_at_tile(tr, tc)
+
+        if prev_is_night and (not self.is_night):
+            self.blood_moon = False
+            for z in self.zombies:
+                z["hp"] = 1
+
+    # ======================================================
+    # ---------------- PLAYER -------------------------------
+    # ======================================================
+    def tick_health(self):
+        # invulnerability, damage cooldown, passive heal
+        if self.invuln_timer > 0:
+            self.invuln_timer -= 1
+
+        if self.damage_timer > 0:
+            self.damage_timer -= 1
+
+        self.frames_since_damage += 1
+        if self.health < MAX_HEALTH and self.frames_since_damage >= HEAL_DELAY_FRAMES:
+            self.heal_tick_timer += 1
+            if self.heal_tick_timer >= HEAL_TICK_FRAMES:
+                self.heal_tick_timer = 0
+                self.health = min(float(MAX_HEALTH), self.health + HEAL_AMOUNT)
+
+    def move_player(self, dx, dy):
+        if dx != 0 or dy != 0:
+            self.last_player_axis = "x" if abs(dx) >= abs(dy) else "y"
+
+        if dx or dy:
+            l = math.hypot(dx, dy)
+            dx /= l
+            dy /= l
+
+        nx = self.px + dx * player_speed
+        ny = self.py + dy * player_speed
+        if not box_solid(self.near_tiles, nx, self.py, HITBOX_SIZE):
+            self.px = nx
+        if not box_solid(self.near_tiles, self.px, ny, HITBOX_SIZE):
+            self.py = ny
+
+    def apply_death_penalty(self):
+        for bid in list(self.inventory.keys()):
+            if bid == VOID:
+                continue
+            self.inventory[bid] = int(self.inventory.get(bid, 0) // 2)
+
+    def respawn_player(self):
+        self.px, self.py = find_safe_spawn(self.world, self.respawn_x, self.respawn_y)
+        self.health = float(MAX_HEALTH)
+        self.damage_timer = 0
+        self.frames_since_damage = 999999
+        self.heal_tick_timer = 0
+        self.invuln_timer = RESPAWN_IMMUNITY_FRAMES
+
+    # ======================================================
+    # ---------------- PLAYER ACTIONS -----------------------
+    # what a click does; the front-end maps the mouse to world
+    # coordinates with camera() after tick() has moved the player
+    # ======================================================
+    def attack(self, x, y):
+        # a left click at world pixel (x, y); True if it hit a zombie
+        if self.mode != "survival":
+            return False
+        for z in self.zombies[:]:
+            if math.hypot(z["x"] - x, z["y"] - y) < 24:
+                z["hp"] -= 1
+                if z["hp"] <= 0:
+                    self.zombies.remove(z)
+                return True
+        return False
+
+    def use_tile(self, r, c, place=False, mine=False):
+        # a click on tile (r, c): creative sets it, survival places
+        # (right button held) onto grass and/or starts mining (left click)
+        world = self.world
+        bid = world.get(r, c)
+        if bid == VOID:
+            return
+
+        selected = self.selected_block
+        if self.mode == "creative":
+            world.set_block(r, c, GRASS if selected == DELETE else selected)
+            return
+
+        if place and selected != DELETE and self.inventory.get(selected, 0) > 0:
+            if bid == GRASS:
+                world.set_block(r, c, selected)
+                self.inventory[selected] -= 1
+
+        if mine and mineable(bid):
+            self.mine_target = (r, c)
+            self.mine_progress = 0
+            self.mining = True
+
+    def stop_mining(self):
+        self.mining = False
+        self.mine_target = None
+        self.mine_progress = 0
+
+    def mine_tick(self, cell):
+        # the left button is still held over `cell`
+        if self.mode != "survival" or not self.mining or not self.mine_target:
+            return
+        if cell != self.mine_target:
+            self.stop_mining()
+            return
+        r, c = cell
+        bid = self.world.get(r, c)
+        if bid == VOID or (not mineable(bid)):
+            self.stop_mining()
+            return
+
+        self.mine_progress += 1
+        need = CORE_MINE_TIME if bid == CORE else MINE_TIME
+        if self.mine_progress >= need:
+            # DROP ITEM (not instant inventory)
+            drop_x = c * blocksize + blocksize / 2
+            drop_y = r * blocksize + blocksize / 2
+            self.dropped_items.append(new_drop(bid, drop_x, drop_y))
+
+            # altar break trigger
+            if bid == CORE and (not self.altar_broken):
+                self.altar_broken = True
+                self.altar_pause_timer = ALTAR_BROKEN_PAUSE_FRAMES
+                print("[DEBUG] ALTAR BROKEN!")
+
+            self.world.set_block(r, c, GRASS)
+            self.stop_mining()
+
+    # ======================================================
+    # ---------------- TICK ---------------------------------
+    # ======================================================
+    def tick(self, move=(0, 0), menu_open=False):
+        # one frame of the world, up to (not including) the player's
+        # clicks. returns whether the game is paused this frame
+        self.frame += 1
+        if self.altar_pause_timer > 0:
+            self.altar_pause_timer -= 1
+        paused = menu_open or (self.altar_pause_timer > 0)
+        survival = self.mode == "survival"
+
+        if survival and not paused:
+            self.advance_cycle()
+        if not paused:
+            self.tick_health()
+            self.move_player(*move)
+
+        world = self.world
+        if not world.infinite:
+            self.px = max(0, min(self.px, world.cols * blocksize - 1))
+            self.py = max(0, min(self.py, world.rows * blocksize - 1))
+
+        if not paused and self.dropped_items:
+            pick_up_drops(self.dropped_items, self.px, self.py, self.inventory)
+
+        # generate chunks a little before they scroll into view
+        cam_x, cam_y = self.camera()
+        view_r = int(cam_y // blocksize)
+        view_c = int(cam_x // blocksize)
+        world.prefetch(view_r - CHUNK_PREFETCH_MARGIN_TILES, view_c - CHUNK_PREFETCH_MARGIN_TILES,
+                       view_r + base_rows + CHUNK_PREFETCH_MARGIN_TILES, view_c + base_cols + CHUNK_PREFETCH_MARGIN_TILES)
+
+        self.chunks_seen(self.mark_seen_chunks(cam_x, cam_y))
+
+        if survival and not paused:
+            if self.frame % SPAWN_CHECK_FRAMES == 0:
+                self.spawn_from_seen_sources()
+            self.update_zombies()
+
+        if survival and self.health <= 0.0:
+            self.apply_death_penalty()
+            self.respawn_player()
+        world.trim()
+        return paused
+
+    def step(self, inputs=None):
+        # one tick driven by a dict instead of the mouse and keyboard:
+        #   "move": (dx, dy)    "select": block id    "paused": a menu is open
+        #   "attack": (x, y)    left click at a world pixel
+        #   "place": (r, c)     right click on a tile
+        #   "mine": (r, c)      left button held on a tile (leave it out to let go)
+        inputs = inputs or {}
+        paused = self.tick(inputs.get("move", (0, 0)), inputs.get("paused", False))
+        if "select" in inputs:
+            self.selected_block = inputs["select"]
+        cell = inputs.get("mine")
+        if cell is None and self.mining:
+            self.stop_mining()
+        if paused:
+            return
+
+        if "attack" in inputs:
+            self.attack(*inputs["attack"])
+        if "place" in inputs:
+            self.use_tile(*inputs["place"], place=True)
+        if cell is not None:
+            cell = tuple(cell)
+            if cell != self.mine_target:
+                self.use_tile(*cell, mine=True)
+            self.mine_tick(cell)
+
+    def run(self, n_ticks, inputs=None):
+        # the same inputs every tick, e.g. run(CYCLE_FRAMES) for a whole day and night
+        for _ in range(n_ticks):
+            self.step(inputs)
+
+    # ======================================================
+    # ---------------- SAVE / LOAD --------------------------
+    # ======================================================
+    def to_save(self):
+        return {
+            "world": self.world.to_save(),
+            "px": self.px,
+            "py": self.py,
+            "respawn_x": self.respawn_x,
+            "respawn_y": self.respawn_y,
+            "inventory": self.inventory,
+            "mode": self.mode,
+            "preset": self.preset,
+            "difficulty": self.difficulty,
+            "version": GAME_VERSION,
+            "health": self.health,
+            "zombies": self.zombies,
+            "dirt_spawned": list(self.dirt_spawned),
+            "dirt_patches": self.dirt_patches.to_save(),
+            "seen_chunks": self.seen_chunks.to_save(),
+            "house_next_spawn_frame": list(self.house_next_spawn_frame),
+            "frames_since_damage": self.frames_since_damage,
+            "heal_tick_timer": self.heal_tick_timer,
+            "invuln_timer": self.invuln_timer,
+            "cycle_frame": self.cycle_frame,
+            "is_night": self.is_night,
+            "blood_moon": self.blood_moon,
+            "dropped_items": self.dropped_items,
+            "altar_pos": self.altar_pos,
+            "altar_broken": self.altar_broken,
+        }
+
+    def load(self, data):
+        # a save payload on top of this game (missing keys keep their
+        # current values, as older saves lack some of them)
+        if "world" in data:
+            self.world = load_world(data["world"], chunk_budget=CHUNK_BUDGET)
+            self.attach_world()
+            if "dirt_patches" in data:
+                self.dirt_patches.load(data["dirt_patches"])
+        self.px = float(data.get("px", self.px))
+        self.py = float(data.get("py", self.py))
+        self.respawn_x = float(data.get("respawn_x", self.respawn_x))
+        self.respawn_y = float(data.get("respawn_y", self.respawn_y))
+        self.inventory = data.get("inventory", self.inventory)
+        self.health = float(data.get("health", self.health))
+        self.zombies = data.get("zombies", self.zombies)
+        self.dirt_spawned = set(data.get("dirt_spawned", list(self.dirt_spawned)))
+        if "seen_chunks" in data:
+            self.seen_chunks = ChunkBitset.from_save(data["seen_chunks"])
+        self.reset_dirt_index()
+        saved_next = data.get("house_next_spawn_frame", [])
+        if "world" in data and "dirt_patches" not in data and len(saved_next) != len(self.houses):
+            # older saves index it by the houses found when that game started;
+            # once one of them was broken the rest can't be matched up
+            saved_next = []
+        for i in range(min(len(saved_next), len(self.house_next_spawn_frame))):
+            self.house_next_spawn_frame[i] = saved_next[i]
+        self.reset_house_schedule()
+        self.frames_since_damage = int(data.get("frames_since_damage", self.frames_since_damage))
+        self.heal_tick_timer = int(data.get("heal_tick_timer", self.heal_tick_timer))
+        self.invuln_timer = int(data.get("invuln_timer", self.invuln_timer))
+        self.cycle_frame = int(data.get("cycle_frame", self.cycle_frame))
+        self.is_night = bool(data.get("is_night", self.is_night))
+        self.blood_moon = bool(data.get("blood_moon", self.blood_moon))
+        self.dropped_items = data.get("dropped_items", [])
+        if "altar_pos" in data:
+            self.altar_pos = tuple(data["altar_pos"])
+        else:
+            self.altar_pos = self.locate_altar(self.altar_pos)
+        self.altar_broken = bool(data.get("altar_broken", self.altar_broken))
+        self.dist_map = {}
+        self.dist_stale = True
+        self.selected_block = DELETE if self.mode == "survival" else GRASS
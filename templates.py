@@ -0,0 +1,65 @@
+# ==========================================
+# Block World - structure templates
+# ==========================================
+import numpy as np
+
+from blocks import WOOD, STONE, BRICK, CORE
+
+ANY = -1    # template cell that matches any block
+
+# ==========================================================
+# TEMPLATES
+# name -> (height, width) array of block ids (ANY = don't care).
+# matching builds one boolean mask per block id in the template,
+# then ANDs shifted views of those masks, one per template cell,
+# so every origin in the grid is tested in the same pass.
+# ==========================================================
+TEMPLATES = {}
+
+
+def register_template(name, rows):
+    TEMPLATES[name] = np.array(rows, dtype=np.int16)
+
+
+def match_template(cells, pattern):
+    # (rows, cols) arrays of every top-left corner where pattern fits in cells
+    ph, pw = pattern.shape
+    h, w = cells.shape[0] - ph + 1, cells.shape[1] - pw + 1
+    if h <= 0 or w <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    masks = {int(bid): cells == bid for bid in np.unique(pattern) if bid != ANY}
+    hit = np.ones((h, w), dtype=bool)
+    for i in range(ph):
+        for j in range(pw):
+            bid = int(pattern[i, j])
+            if bid == ANY:
+                continue
+            hit &= masks[bid][i:i + h, j:j + w]
+        if not hit.any():
+            break
+    return np.nonzero(hit)
+
+
+def find_template(name, cells, top=0, left=0):
+    # world coords (row-major) of every `name` in a tile rect copied out at (top, left)
+    rs, cs = match_template(cells, TEMPLATES[name])
+    return list(zip((rs + top).tolist(), (cs + left).tolist()))
+
+
+B, W, S, C = BRICK, WOOD, STONE, CORE
+
+register_template("house", [
+    [B, B, B, B],
+    [B, W, W, B],
+    [B, W, W, B],
+    [B, B, B, B],
+])
+
+register_template("altar", [
+    [B, B, B, B, B],
+    [B, S, S, S, B],
+    [B, S, C, S, B],
+    [B, S, S, S, B],
+    [B, B, B, B, B],
+])
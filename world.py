@@ -0,0 +1,679 @@
+# ==========================================
+# Block World - world storage
+# ==========================================
+import tempfile
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# ==========================================================
+# CHUNKS / REGIONS
+# tiles live in 16x16 chunks (row-major, see Chunk).
+# worldgen works on 4x4-chunk regions: the first touch of any
+# chunk generates its whole region, so structures never get
+# cut in half by a chunk border.
+# ==========================================================
+CHUNK_SIZE = 16
+CHUNK_SHIFT = 4
+CHUNK_MASK = CHUNK_SIZE - 1
+CHUNK_AREA = CHUNK_SIZE * CHUNK_SIZE
+
+REGION_CHUNKS = 4
+REGION_TILES = CHUNK_SIZE * REGION_CHUNKS
+
+# a chunk as one int: (cr << TILE_KEY_SHIFT) + cc, for cc well inside +-2**31
+TILE_KEY_SHIFT = 32
+
+# most recently prefetched chunks whose tiles get() serves from a
+# plain bytearray instead of decoding them on every read (256 bytes each)
+DECODED_CHUNKS = 256
+
+
+# ==========================================================
+# CHUNK
+# a chunk picks the smallest form for how varied it is:
+#   uniform  - one block id, no tile data (shared per id)
+#   palette  - up to 16 ids, tiles bit-packed as 1/2/4 bit indices
+#   dense    - one byte per tile
+# reads are the hot path; writes (player edits) just re-encode,
+# so set() returns the chunk to store from now on.
+# ==========================================================
+_BYTE_SHIFT = {1: 3, 2: 2, 4: 1}            # tile index -> byte index
+_PACK_SHIFTS = {bits: np.arange(8 // bits, dtype=np.uint8) * bits for bits in (1, 2, 4)}
+_UNIFORM = {}
+_UNIFORM_TILES = [bytes([bid]) * CHUNK_AREA for bid in range(256)]     # a uniform chunk's tiles, per id
+
+
+class Chunk:
+    __slots__ = ("value", "bits", "data", "shift", "lane", "index_mask")
+
+    def __init__(self, value=0, bits=0, data=None):
+        self.value = value              # uniform: the block id
+        self.bits = bits                # 0 uniform, 1/2/4 palette, 8 dense
+        self.data = data                # palette: 2**bits palette ids, then packed indices
+        # palette reads, worked out once: tile i is index slot (i & lane)
+        # of byte (i >> shift) after the palette
+        self.shift = _BYTE_SHIFT.get(bits, 0)
+        self.lane = (1 << self.shift) - 1
+        self.index_mask = (1 << bits) - 1
+
+    @classmethod
+    def uniform(cls, bid):
+        chunk = _UNIFORM.get(bid)
+        if chunk is None:
+            chunk = _UNIFORM[bid] = cls(value=bid)
+        return chunk
+
+    @classmethod
+    def from_bytes(cls, raw):
+        values = set(raw)
+        if len(values) == 1:
+            return cls.uniform(raw[0])
+        if len(values) > 16:
+            return cls(bits=8, data=bytearray(raw))
+
+        n = len(values)
+        bits = 1 if n <= 2 else 2 if n <= 4 else 4
+        palette = sorted(values)
+        palette += [palette[-1]] * ((1 << bits) - n)
+        table = bytearray(256)
+        for k, bid in enumerate(palette[:n]):
+            table[bid] = k
+        idx = np.frombuffer(bytes(raw).translate(table), dtype=np.uint8).reshape(-1, 8 // bits)
+        packed = np.bitwise_or.reduce(idx << _PACK_SHIFTS[bits], axis=1).astype(np.uint8)
+        return cls(bits=bits, data=bytes(palette) + packed.tobytes())
+
+    @property
+    def form(self):
+        if self.bits == 0:
+            return "uniform"
+        if self.bits == 8:
+            return "dense"
+        return f"palette{self.bits}"
+
+    def get(self, i):
+        bits = self.bits
+        if bits == 0:
+            return self.value
+        data = self.data
+        if bits == 8:
+            return data[i]
+        return data[(data[self.index_mask + 1 + (i >> self.shift)] >> ((i & self.lane) * bits)) & self.index_mask]
+
+    def set(self, i, bid):
+        if self.bits == 8:
+            self.data[i] = bid
+            if len(set(self.data)) <= 16:
+                return Chunk.from_bytes(self.data)
+            return self
+        if self.get(i) == bid:
+            return self
+        raw = bytearray(self.to_bytes())
+        raw[i] = bid
+        return Chunk.from_bytes(raw)
+
+    def to_bytes(self):
+        bits = self.bits
+        if bits == 0:
+            return bytes([self.value]) * CHUNK_AREA
+        if bits == 8:
+            return bytes(self.data)
+        palette = np.frombuffer(self.data, dtype=np.uint8, count=1 << bits)
+        packed = np.frombuffer(self.data, dtype=np.uint8, offset=1 << bits)
+        idx = (packed[:, None] >> _PACK_SHIFTS[bits]) & ((1 << bits) - 1)
+        return palette[idx.ravel()].tobytes()
+
+
+def encode_chunks(blocks):
+    # Chunk.from_bytes for a stack of (n, CHUNK_AREA) tile blocks at
+    # once: ids present per block, each tile's index into its block's
+    # palette, palettes and packing, all worked out for the whole stack.
+    # only pays off for big stacks (a whole world, not one region)
+    n = len(blocks)
+    present = np.zeros((n, 256), dtype=bool)
+    present[np.arange(n)[:, None], blocks] = True
+    counts = present.sum(axis=1)
+    rank = np.cumsum(present, axis=1, dtype=np.uint16) - 1
+    chunks = [None] * n
+    for bits, fewest, most in ((1, 2, 2), (2, 3, 4), (4, 5, 16)):
+        group = np.nonzero((counts >= fewest) & (counts <= most))[0]
+        if not len(group):
+            continue
+        g = len(group)
+        idx = rank[group[:, None], blocks[group]].astype(np.uint8).reshape(g, -1, 8 // bits)
+        packed = np.bitwise_or.reduce(idx << _PACK_SHIFTS[bits], axis=2).astype(np.uint8)
+        # sorted ids present, padded with the last one
+        rows, ids = np.nonzero(present[group])
+        palette = np.zeros((g, 1 << bits), dtype=np.uint8)
+        palette[rows, rank[group[rows], ids]] = ids
+        last = palette[np.arange(g), counts[group] - 1]
+        palette = np.where(np.arange(1 << bits) >= counts[group][:, None], last[:, None], palette)
+        data = np.hstack([palette, packed]).tobytes()
+        size = (1 << bits) + len(packed[0])
+        for k, i in enumerate(group.tolist()):
+            chunks[i] = Chunk(bits=bits, data=data[k * size:(k + 1) * size])
+    for i in np.nonzero(counts == 1)[0].tolist():
+        chunks[i] = Chunk.uniform(int(blocks[i, 0]))
+    for i in np.nonzero(counts > 16)[0].tolist():
+        chunks[i] = Chunk(bits=8, data=bytearray(blocks[i].tobytes()))
+    return chunks
+
+
+def chunk_of(r, c):
+    return (r >> CHUNK_SHIFT, c >> CHUNK_SHIFT)
+
+
+def region_of_chunk(cr, cc):
+    return (cr // REGION_CHUNKS, cc // REGION_CHUNKS)
+
+
+# ==========================================================
+# CHUNK BITSET
+# one bit per chunk key, in pages of 64x64 chunks (512 bytes),
+# so a finite world is a page or a few and an infinite one only
+# pays for the pages it has touched. pages pickle as bytes.
+# ==========================================================
+PAGE_SHIFT = 6
+PAGE_MASK = (1 << PAGE_SHIFT) - 1
+PAGE_BYTES = (1 << (PAGE_SHIFT * 2)) // 8
+
+
+class ChunkBitset:
+    def __init__(self, keys=()):
+        self.pages = {}     # (cr >> PAGE_SHIFT, cc >> PAGE_SHIFT) -> bytearray
+        self.count = 0
+        for key in keys:
+            self.add(tuple(key))
+
+    def __contains__(self, key):
+        cr, cc = key
+        page = self.pages.get((cr >> PAGE_SHIFT, cc >> PAGE_SHIFT))
+        if page is None:
+            return False
+        bit = ((cr & PAGE_MASK) << PAGE_SHIFT) | (cc & PAGE_MASK)
+        return bool(page[bit >> 3] & (1 << (bit & 7)))
+
+    def add(self, key):
+        # True if the key wasn't in the set yet
+        cr, cc = key
+        pkey = (cr >> PAGE_SHIFT, cc >> PAGE_SHIFT)
+        page = self.pages.get(pkey)
+        if page is None:
+            page = self.pages[pkey] = bytearray(PAGE_BYTES)
+        bit = ((cr & PAGE_MASK) << PAGE_SHIFT) | (cc & PAGE_MASK)
+        mask = 1 << (bit & 7)
+        if page[bit >> 3] & mask:
+            return False
+        page[bit >> 3] |= mask
+        self.count += 1
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for (pr, pc), page in self.pages.items():
+            for i, byte in enumerate(page):
+                if not byte:
+                    continue
+                for j in range(8):
+                    if byte & (1 << j):
+                        bit = (i << 3) | j
+                        yield ((pr << PAGE_SHIFT) | (bit >> PAGE_SHIFT), (pc << PAGE_SHIFT) | (bit & PAGE_MASK))
+
+    def to_save(self):
+        return {key: bytes(page) for key, page in self.pages.items()}
+
+    @classmethod
+    def from_save(cls, data):
+        # saves before the bitset stored a list of chunk keys
+        if not isinstance(data, dict):
+            return cls(data)
+        bits = cls()
+        for key, page in data.items():
+            bits.pages[tuple(key)] = bytearray(page)
+            bits.count += sum(bin(b).count("1") for b in page)
+        return bits
+
+
+# ==========================================================
+# REGION FILE
+# append-only store for chunks evicted from memory; a chunk
+# written twice just points at its newest record
+# ==========================================================
+class RegionFile:
+    def __init__(self, path=None):
+        if path is None:
+            self._f = tempfile.TemporaryFile(prefix="blockworld-", suffix=".region")
+        else:
+            self._f = open(path, "w+b")
+        self._index = {}                # (cr, cc) -> (offset, length)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def keys(self):
+        return self._index.keys()
+
+    def write(self, key, data):
+        blob = zlib.compress(data)
+        self._f.seek(0, 2)
+        self._index[key] = (self._f.tell(), len(blob))
+        self._f.write(blob)
+
+    def read(self, key):
+        offset, length = self._index[key]
+        self._f.seek(offset)
+        return zlib.decompress(self._f.read(length))
+
+    def close(self):
+        self._f.close()
+
+
+# ==========================================================
+# WORLD GRID
+# generator: object with generate_region(rr, rc) returning a
+# REGION_TILES x REGION_TILES uint8 array for that region.
+# without one, missing chunks are just filled with `fill`.
+#
+# infinite worlds have no border (rows/cols are only the
+# nominal size used for the altar and spawn). with a
+# chunk_budget, the least recently viewed chunks past the
+# budget are written to a region file and dropped;
+# on_chunk_unloaded listeners hear about each one, and
+# on_chunk_reloaded ones when it is read back.
+#
+# get() reads the last DECODED_CHUNKS prefetched chunks (the
+# ones around the player) from decoded copies, which set() keeps
+# up to date; the chunks themselves stay packed. those copies and
+# the tiles of uniform and dense chunks are indexed by one int
+# per chunk (_tiles), so most reads are a dict lookup and an index.
+# ==========================================================
+class WorldGrid:
+    def __init__(self, rows, cols, fill=0, outside=0, generator=None, infinite=False, chunk_budget=None):
+        self.rows = rows
+        self.cols = cols
+        self.fill = fill
+        self.outside = outside          # value returned outside the world
+        self.generator = generator
+        self.infinite = infinite
+        self.chunk_budget = chunk_budget
+
+        self._chunks = OrderedDict()    # (cr, cc) -> Chunk, oldest view first
+        self._decoded = OrderedDict()   # (cr, cc) -> bytearray of its tiles, oldest prefetch first
+        self._tiles = {}                # tile_key(cr, cc) -> tiles get() can index (see _point)
+        self._dirty = set()             # chunks changed since last written to the region file
+        self.region_file = None
+        self._generated = set()
+        self.generated_regions = []     # region keys, in generation order
+        self.structures = {}            # region key -> [(kind, top, left, height, width)] from the generator
+        self.on_region_generated = []   # callbacks(top, left, height, width, structures or None)
+        self.on_block_changed = []      # callbacks(r, c, old, new), see set_block
+        self.on_chunk_unloaded = []     # callbacks(cr, cc)
+        self.on_chunk_reloaded = []     # callbacks(cr, cc)
+
+        self.chunk_rows = (rows + CHUNK_MASK) // CHUNK_SIZE
+        self.chunk_cols = (cols + CHUNK_MASK) // CHUNK_SIZE
+        self.region_rows = (self.chunk_rows + REGION_CHUNKS - 1) // REGION_CHUNKS
+        self.region_cols = (self.chunk_cols + REGION_CHUNKS - 1) // REGION_CHUNKS
+        # chunk rows / cols wholly inside the world (no end for infinite ones)
+        self._whole_rows = float("inf") if infinite else rows >> CHUNK_SHIFT
+        self._whole_cols = float("inf") if infinite else cols >> CHUNK_SHIFT
+
+    def in_bounds(self, r, c):
+        return self.infinite or (0 <= r < self.rows and 0 <= c < self.cols)
+
+    def get(self, r, c):
+        tiles = self._tiles.get(((r >> CHUNK_SHIFT) << TILE_KEY_SHIFT) + (c >> CHUNK_SHIFT))
+        if tiles is not None:
+            return tiles[((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK)]
+        if self.infinite or (0 <= r < self.rows and 0 <= c < self.cols):
+            key = (r >> CHUNK_SHIFT, c >> CHUNK_SHIFT)
+            tiles = self._decoded.get(key)
+            if tiles is not None:
+                return tiles[((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK)]
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                chunk = self._load_chunk(*key)
+            return chunk.get(((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK))
+        return self.outside
+
+    def peek(self, r, c):
+        # get() that never loads or generates: a tile whose chunk isn't
+        # in memory reads as outside the world (for entities out there)
+        tiles = self._tiles.get(((r >> CHUNK_SHIFT) << TILE_KEY_SHIFT) + (c >> CHUNK_SHIFT))
+        if tiles is not None:
+            return tiles[((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK)]
+        if self.infinite or (0 <= r < self.rows and 0 <= c < self.cols):
+            key = (r >> CHUNK_SHIFT, c >> CHUNK_SHIFT)
+            tiles = self._decoded.get(key)
+            if tiles is not None:
+                return tiles[((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK)]
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                return chunk.get(((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK))
+        return self.outside
+
+    def set(self, r, c, bid):
+        if self.infinite or (0 <= r < self.rows and 0 <= c < self.cols):
+            key = (r >> CHUNK_SHIFT, c >> CHUNK_SHIFT)
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                chunk = self._load_chunk(*key)
+            i = ((r & CHUNK_MASK) << CHUNK_SHIFT) | (c & CHUNK_MASK)
+            new = chunk.set(i, bid)
+            if new is not chunk:
+                self._chunks[key] = new
+            self._dirty.add(key)
+            tiles = self._decoded.get(key)
+            if tiles is not None:
+                tiles[i] = bid
+            else:
+                self._point(*key)
+
+    def _point(self, cr, cc):
+        # keep the chunk's _tiles entry current: its decoded copy, else a
+        # uniform or dense chunk's own tiles. only chunks wholly inside
+        # the world get one, so get() needs no bounds check for them
+        if not (cr < self._whole_rows and cc < self._whole_cols):
+            return
+        key = (cr << TILE_KEY_SHIFT) + cc
+        tiles = self._decoded.get((cr, cc))
+        if tiles is None:
+            chunk = self._chunks.get((cr, cc))
+            if chunk is not None and chunk.bits == 0:
+                tiles = _UNIFORM_TILES[chunk.value]
+            elif chunk is not None and chunk.bits == 8:
+                tiles = chunk.data
+        if tiles is None:
+            self._tiles.pop(key, None)
+        else:
+            self._tiles[key] = tiles
+
+    def set_block(self, r, c, bid):
+        # the one way gameplay edits tiles: tells every listener (the
+        # front end keeps its own dirty set). returns False if nothing changed
+        if not self.in_bounds(r, c):
+            return False
+        old = self.get(r, c)
+        if old == bid:
+            return False
+        self.set(r, c, bid)
+        for fn in self.on_block_changed:
+            fn(r, c, old, bid)
+        return True
+
+    # ------------------------------------------------------
+    # chunk loading / lazy generation
+    # ------------------------------------------------------
+    def has_chunk(self, cr, cc):
+        return (cr, cc) in self._chunks
+
+    def loaded_chunks(self):
+        return len(self._chunks)
+
+    def _chunk(self, cr, cc):
+        chunk = self._chunks.get((cr, cc))
+        if chunk is None:
+            chunk = self._load_chunk(cr, cc)
+        return chunk
+
+    def _load_chunk(self, cr, cc):
+        key = (cr, cc)
+        if self.region_file is not None and key in self.region_file:
+            chunk = Chunk.from_bytes(self.region_file.read(key))
+            self._chunks[key] = chunk
+            self._point(cr, cc)
+            for fn in self.on_chunk_reloaded:
+                fn(cr, cc)
+            return chunk
+
+        region = region_of_chunk(cr, cc)
+        if self.generator is not None and region not in self._generated:
+            self.generate_region(*region)
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                return chunk
+
+        chunk = Chunk.uniform(self.fill)
+        self._chunks[key] = chunk
+        self._point(cr, cc)
+        self._dirty.add(key)
+        return chunk
+
+    def generate_region(self, rr, rc):
+        cells, structures = self.generator.generate_region(rr, rc)
+        self.install_region(rr, rc, cells, structures)
+
+    def missing_regions(self):
+        # region keys of a finite world that haven't been generated yet
+        if self.infinite:
+            return []
+        return [(rr, rc) for rr in range(self.region_rows) for rc in range(self.region_cols)
+                if (rr, rc) not in self._generated]
+
+    def has_region(self, rr, rc):
+        return (rr, rc) in self._generated
+
+    def install_region(self, rr, rc, cells, structures=None, chunks=None):
+        # chunks: the region's chunks already encoded, row-major (see encode_chunks)
+        cr0 = rr * REGION_CHUNKS
+        cc0 = rc * REGION_CHUNKS
+        if chunks is None:
+            # (i, j, 16, 16) view of the region's chunks, uniform ones found in bulk
+            blocks = cells.reshape(REGION_CHUNKS, CHUNK_SIZE, REGION_CHUNKS, CHUNK_SIZE).swapaxes(1, 2)
+            lo = blocks.min(axis=(2, 3)).tolist()
+            hi = blocks.max(axis=(2, 3)).tolist()
+            chunks = [Chunk.uniform(lo[i][j]) if lo[i][j] == hi[i][j] else Chunk.from_bytes(blocks[i, j].tobytes())
+                      for i in range(REGION_CHUNKS) for j in range(REGION_CHUNKS)]
+        for i in range(REGION_CHUNKS):
+            cr = cr0 + i
+            if not self.infinite and (cr < 0 or cr >= self.chunk_rows):
+                continue
+            for j in range(REGION_CHUNKS):
+                cc = cc0 + j
+                if not self.infinite and (cc < 0 or cc >= self.chunk_cols):
+                    continue
+                if (cr, cc) in self._chunks:
+                    continue
+                self._chunks[(cr, cc)] = chunks[i * REGION_CHUNKS + j]
+                self._point(cr, cc)
+                self._dirty.add((cr, cc))
+
+        self._generated.add((rr, rc))
+        self.generated_regions.append((rr, rc))
+        if structures is not None:
+            self.structures[(rr, rc)] = structures
+        top, left, height, width = self.region_bounds(rr, rc)
+        for fn in self.on_region_generated:
+            fn(top, left, height, width, structures)
+
+    def region_bounds(self, rr, rc):
+        # tile rect of a region, clipped to the world
+        top = rr * REGION_TILES
+        left = rc * REGION_TILES
+        if self.infinite:
+            return top, left, REGION_TILES, REGION_TILES
+        height = min(self.rows, top + REGION_TILES) - top
+        width = min(self.cols, left + REGION_TILES) - left
+        return top, left, height, width
+
+    def prefetch(self, top, left, bottom, right):
+        # make sure every chunk touching the tile rect [top..bottom] x [left..right]
+        # is in memory, mark them as just viewed, then trim to the budget
+        if not self.infinite:
+            top, left = max(0, top), max(0, left)
+            bottom, right = min(self.rows - 1, bottom), min(self.cols - 1, right)
+        chunks = self._chunks
+        decoded = self._decoded
+        for cr in range(top >> CHUNK_SHIFT, (bottom >> CHUNK_SHIFT) + 1):
+            for cc in range(left >> CHUNK_SHIFT, (right >> CHUNK_SHIFT) + 1):
+                key = (cr, cc)
+                if key in chunks:
+                    chunks.move_to_end(key)
+                else:
+                    self._load_chunk(cr, cc)
+                if key in decoded:
+                    decoded.move_to_end(key)
+                else:
+                    decoded[key] = bytearray(chunks[key].to_bytes())
+                    self._point(cr, cc)
+        while len(decoded) > DECODED_CHUNKS:
+            self._point(*decoded.popitem(last=False)[0])
+        self.trim()
+
+    def trim(self):
+        # evict least recently viewed chunks over the budget
+        if self.chunk_budget is None:
+            return
+        while len(self._chunks) > self.chunk_budget:
+            key, chunk = self._chunks.popitem(last=False)
+            self._decoded.pop(key, None)
+            self._point(*key)
+            if key in self._dirty:
+                if self.region_file is None:
+                    self.region_file = RegionFile()
+                self.region_file.write(key, chunk.to_bytes())
+                self._dirty.discard(key)
+            for fn in self.on_chunk_unloaded:
+                fn(*key)
+
+    # ------------------------------------------------------
+    # bulk helpers
+    # ------------------------------------------------------
+    def rect(self, top, left, height, width):
+        # copy of a tile rect as a (height, width) uint8 array
+        out = np.full((height, width), self.outside, dtype=np.uint8)
+        r0, c0 = top, left
+        r1, c1 = top + height, left + width
+        if not self.infinite:
+            r0, c0 = max(0, r0), max(0, c0)
+            r1, c1 = min(self.rows, r1), min(self.cols, c1)
+        if r0 >= r1 or c0 >= c1:
+            return out
+        for cr in range(r0 >> CHUNK_SHIFT, ((r1 - 1) >> CHUNK_SHIFT) + 1):
+            for cc in range(c0 >> CHUNK_SHIFT, ((c1 - 1) >> CHUNK_SHIFT) + 1):
+                tiles = self._decoded.get((cr, cc))
+                if tiles is None:
+                    tiles = self._chunk(cr, cc).to_bytes()
+                block = np.frombuffer(tiles, dtype=np.uint8).reshape(CHUNK_SIZE, CHUNK_SIZE)
+                br0, bc0 = cr * CHUNK_SIZE, cc * CHUNK_SIZE
+                sr0, sr1 = max(r0, br0), min(r1, br0 + CHUNK_SIZE)
+                sc0, sc1 = max(c0, bc0), min(c1, bc0 + CHUNK_SIZE)
+                out[sr0 - top:sr1 - top, sc0 - left:sc1 - left] = block[sr0 - br0:sr1 - br0, sc0 - bc0:sc1 - bc0]
+        return out
+
+    def positions(self, bid, top, left, height, width):
+        # world coords of every `bid` tile inside a tile rect, row-major
+        rs, cs = np.nonzero(self.rect(top, left, height, width) == bid)
+        return list(zip((rs + top).tolist(), (cs + left).tolist()))
+
+    def window(self, top, left, height, width):
+        return TileWindow(self, top, left, height, width)
+
+    # ------------------------------------------------------
+    # saving
+    # only generated chunks are stored (including evicted ones);
+    # the rest regenerate from the generator settings
+    # ------------------------------------------------------
+    def to_save(self):
+        chunks = {key: chunk.to_bytes() for key, chunk in self._chunks.items()}
+        if self.region_file is not None:
+            for key in self.region_file.keys():
+                if key not in chunks:
+                    chunks[key] = self.region_file.read(key)
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "infinite": self.infinite,
+            "chunks": chunks,
+            "regions": list(self.generated_regions),
+            "structures": self.structures,
+            "generator": self.generator.to_save() if self.generator is not None else None,
+        }
+
+    @classmethod
+    def from_save(cls, data, fill=0, outside=0, generator=None, chunk_budget=None):
+        # old saves stored the world as a list of row lists,
+        # Alpha-0.9 saves as one flat cell buffer
+        if isinstance(data, list):
+            rows = len(data)
+            cols = len(data[0]) if rows else 0
+            return cls.from_array(np.asarray(data, dtype=np.uint8).reshape(rows, cols), fill, outside)
+        if "cells" in data:
+            cells = np.frombuffer(data["cells"], dtype=np.uint8).reshape(data["rows"], data["cols"])
+            return cls.from_array(cells, fill, outside)
+
+        world = cls(data["rows"], data["cols"], fill=fill, outside=outside, generator=generator,
+                    infinite=data.get("infinite", False), chunk_budget=chunk_budget)
+        for key, chunk in data["chunks"].items():
+            world._chunks[tuple(key)] = Chunk.from_bytes(chunk)
+            world._point(*key)
+            world._dirty.add(tuple(key))
+        world.generated_regions = [tuple(key) for key in data.get("regions", [])]
+        world._generated = set(world.generated_regions)
+        # saves from before the registry have none; their regions get rescanned
+        world.structures = {tuple(key): [tuple(s) for s in entries]
+                            for key, entries in data.get("structures", {}).items()}
+        return world
+
+    @classmethod
+    def from_array(cls, cells, fill=0, outside=0):
+        rows, cols = cells.shape
+        world = cls(rows, cols, fill=fill, outside=outside)
+        padded = np.full((world.chunk_rows * CHUNK_SIZE, world.chunk_cols * CHUNK_SIZE), outside, dtype=np.uint8)
+        padded[:rows, :cols] = cells
+        for cr in range(world.chunk_rows):
+            for cc in range(world.chunk_cols):
+                block = padded[cr * CHUNK_SIZE:(cr + 1) * CHUNK_SIZE, cc * CHUNK_SIZE:(cc + 1) * CHUNK_SIZE]
+                world._chunks[(cr, cc)] = Chunk.from_bytes(block.tobytes())
+                world._point(cr, cc)
+        world.generated_regions = [(rr, rc) for rr in range(world.region_rows) for rc in range(world.region_cols)]
+        world._generated = set(world.generated_regions)
+        return world
+
+
+# ==========================================================
+# TILE WINDOW
+# a rect of tiles copied out of a world once (world.rect), read
+# like the world: get() inside it is one bytearray lookup, reads
+# outside it fall through to world.peek, so they never pull a
+# chunk back into memory. whoever holds one keeps it current by
+# passing it the world's block changes.
+# ==========================================================
+class TileWindow:
+    def __init__(self, world, top, left, height, width):
+        self.world = world
+        self.rows = world.rows
+        self.cols = world.cols
+        self.infinite = world.infinite
+        self.top = top
+        self.left = left
+        self.height = height
+        self.width = width
+        self.tiles = bytearray(world.rect(top, left, height, width).tobytes())
+
+    def in_bounds(self, r, c):
+        return self.world.in_bounds(r, c)
+
+    def get(self, r, c):
+        r0 = r - self.top
+        c0 = c - self.left
+        if 0 <= r0 < self.height and 0 <= c0 < self.width:
+            return self.tiles[r0 * self.width + c0]
+        return self.world.peek(r, c)
+
+    def rect(self, top, left, height, width):
+        r0 = top - self.top
+        c0 = left - self.left
+        if r0 < 0 or c0 < 0 or r0 + height > self.height or c0 + width > self.width:
+            return self.world.rect(top, left, height, width)
+        cells = np.frombuffer(self.tiles, dtype=np.uint8).reshape(self.height, self.width)
+        return cells[r0:r0 + height, c0:c0 + width].copy()
+
+    def tile_changed(self, r, c, old, new):
+        r0 = r - self.top
+        c0 = c - self.left
+        if 0 <= r0 < self.height and 0 <= c0 < self.width:
+            self.tiles[r0 * self.width + c0] = new
@@ -0,0 +1,801 @@
+# ==========================================
+# Block World - world generation
+# ==========================================
+import multiprocessing
+import os
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from blocks import VOID, GRASS, DIRT, WOOD, LEAVES, WATER, STONE, BRICK, CORE
+from world import WorldGrid, CHUNK_SIZE, CHUNK_AREA, REGION_CHUNKS, REGION_TILES, encode_chunks
+
+# structure counts below were tuned for the 750x450 world,
+# each region gets its share of them by area
+REFERENCE_AREA = 750 * 450
+
+# below this many regions a process pool costs more to start than it saves
+PARALLEL_MIN_REGIONS = 256
+
+# a new finite world is played once the regions this many tiles round
+# the spawn are in (find_safe_spawn looks 20 out, the view 13 more)
+SPAWN_REACH = 32
+
+
+def _fill_clipped(cells, top, left, r0, c0, r1, c1, bid):
+    # fill world tiles [r0, r1) x [c0, c1), clipped to a region array at (top, left)
+    h, w = cells.shape
+    r0, r1 = max(r0 - top, 0), min(r1 - top, h)
+    c0, c1 = max(c0 - left, 0), min(c1 - left, w)
+    if r0 < r1 and c0 < c1:
+        cells[r0:r1, c0:c1] = bid
+
+
+# ==========================================================
+# OCCUPANCY INDEX
+# summed-area table over the "blocked" tiles of a region (anything
+# that isn't GRASS, plus the altar's keep-out square), so "is this
+# rect all free" is four lookups. stamping only ORs the structure
+# into the blocked map; most structures fit on the first try, so the
+# table is only rebuilt once a placement keeps missing.
+# ==========================================================
+SAT_REBUILD_MISSES = 4
+
+
+class OccupancyIndex:
+    def __init__(self, cells, top, left, altar_pos):
+        self.cells = cells
+        self.blocked = (cells != GRASS).astype(np.int32)
+        altar_r, altar_c = altar_pos
+        _fill_clipped(self.blocked, top, left, altar_r - 3, altar_c - 3, altar_r + 4, altar_c + 4, 1)
+
+        h, w = cells.shape
+        self.sat = np.zeros((h + 1, w + 1), dtype=np.int32)
+        self._rows = np.empty((h, w), dtype=np.int32)
+        self._stale = True
+        self._misses = 0
+
+    def _rebuild(self):
+        np.cumsum(self.blocked, axis=0, out=self._rows)
+        np.cumsum(self._rows, axis=1, out=self.sat[1:, 1:])
+        self._stale = False
+
+    def is_clear(self, top, left, height, width):
+        # local (region) coords, rect must already be inside the region
+        if self._stale:
+            if self._misses < SAT_REBUILD_MISSES:
+                if self.blocked[top:top + height, left:left + width].any():
+                    self._misses += 1
+                    return False
+                return True
+            self._rebuild()
+        sat = self.sat
+        b, r = top + height, left + width
+        return sat.item(b, r) - sat.item(top, r) - sat.item(b, left) + sat.item(top, left) == 0
+
+    def mark(self, top, left, height, width):
+        # fold a freshly stamped rect (local coords) into the blocked map
+        self.blocked[top:top + height, left:left + width] |= self.cells[top:top + height, left:left + width] != GRASS
+        self._stale = True
+        self._misses = 0
+
+
+# ==========================================================
+# TERRAIN NOISE
+# value noise on a global lattice: every lattice point gets a hashed
+# value in [0, 1), and a region is upsampled from its patch of the
+# lattice with smoothstep weights. all octaves go through one pair of
+# matrix products (weights side by side, lattices block-diagonal).
+# it only depends on world coords, so regions stitch up in any order.
+# ==========================================================
+TERRAIN_OCTAVES = ((128, 1.0), (64, 0.5), (32, 0.25), (16, 0.125), (8, 0.0625))
+SOIL_OCTAVES = ((8, 1.0), (4, 0.5))
+
+# thresholds on the fields above
+TERRAIN_WATER = 0.32     # elevation below -> WATER
+TERRAIN_STONE = 0.66     # elevation above -> STONE
+TERRAIN_DIRT = 0.74      # soil above (on grass) -> DIRT
+
+_NOISE_LAYOUT = {}       # (octaves, row offset, col offset) -> NoiseLayout
+
+
+def _interp_weights(spacing, offset):
+    # (REGION_TILES, lattice points) smoothstep weights along one axis
+    pos = (np.arange(REGION_TILES) + offset) / spacing
+    i = pos.astype(np.int64)
+    f = pos - i
+    u = f * f * (3 - 2 * f)
+    rows = np.arange(REGION_TILES)
+    weights = np.zeros((REGION_TILES, int(i[-1]) + 2))
+    weights[rows, i] = 1 - u
+    weights[rows, i + 1] = u
+    return weights
+
+
+class NoiseLayout:
+    # everything about a noise field that doesn't depend on where the
+    # region is, only on its offset inside the coarsest lattice cell
+    def __init__(self, octaves, row_offset, col_offset):
+        wr = [_interp_weights(spacing, row_offset % spacing) for spacing, _ in octaves]
+        wc = [_interp_weights(spacing, col_offset % spacing) for spacing, _ in octaves]
+        norm = sum(amp for _, amp in octaves)
+        self.wr = np.hstack(wr)
+        self.wc_t = np.hstack(wc).T
+
+        # per lattice row/col: which octave's spacing it uses, and its index in that octave's patch
+        self.row_spacing = np.concatenate([np.full(w.shape[1], sp) for w, (sp, _) in zip(wr, octaves)])
+        self.col_spacing = np.concatenate([np.full(w.shape[1], sp) for w, (sp, _) in zip(wc, octaves)])
+        self.row_index = np.concatenate([np.arange(w.shape[1]) for w in wr])
+        self.col_index = np.concatenate([np.arange(w.shape[1]) for w in wc])
+
+        # block-diagonal: octave salt for the hash, amplitude mask for the sum
+        self.salt = np.zeros((len(self.row_index), len(self.col_index)), dtype=np.int64)
+        self.amp = np.zeros(self.salt.shape)
+        r0 = c0 = 0
+        for octave, (a, b, (_, amp)) in enumerate(zip(wr, wc, octaves)):
+            r1, c1 = r0 + a.shape[1], c0 + b.shape[1]
+            self.salt[r0:r1, c0:c1] = octave * 1000003
+            self.amp[r0:r1, c0:c1] = amp / norm
+            r0, c0 = r1, c1
+
+
+def noise_field(key, top, left, octaves):
+    # fBm value noise over the region whose top-left tile is (top, left)
+    coarse = octaves[0][0]
+    layout = _NOISE_LAYOUT.get((octaves, top % coarse, left % coarse))
+    if layout is None:
+        layout = NoiseLayout(octaves, top % coarse, left % coarse)
+        _NOISE_LAYOUT[(octaves, top % coarse, left % coarse)] = layout
+
+    ir = (top // layout.row_spacing + layout.row_index)[:, None]
+    ic = (left // layout.col_spacing + layout.col_index)[None, :]
+    h = (ir * 73856093 ^ ic * 19349663 ^ (layout.salt + key)).astype(np.uint64)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xC4CEB9FE1A85EC53)
+    h ^= h >> np.uint64(33)
+    lattice = (h >> np.uint64(40)) * (layout.amp / (1 << 24))
+    return layout.wr @ lattice @ layout.wc_t
+
+
+# ==========================================================
+# REGION GENERATOR
+# every region has its own RNG seeded from (seed, region) and lays
+# out its structures on its own (its "layout"), against its base
+# tiles and a STRUCTURE_REACH margin around them. a structure
+# belongs to the region its top-left corner is in but may stick out
+# of it; where two regions' layouts collide, the region that sorts
+# first keeps its structure. a region is its base tiles with every
+# surviving structure of itself and its 8 neighbours stamped in, so
+# it comes out the same no matter when (or where) it is built.
+# generate_region returns the tiles and a registry of the structures
+# that start in it: (kind, top, left, height, width) in world tiles,
+# with kind one of lake/tree/house/vein/big_tree/altar, plus the
+# region's DIRT (placed patches and the terrain's own alike) as
+# "dirt" rects read off its finished tiles, so nobody has to look
+# for it again
+# ==========================================================
+STRUCTURE_REACH = 8         # biggest structure (6) plus its padding (2)
+LAYOUT_CACHE_SIZE = 512     # layouts / base tiles kept per generator; neighbours share them
+NEIGHBOURHOOD = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+
+
+def _rects_overlap(a_top, a_left, a_h, a_w, b_top, b_left, b_h, b_w):
+    return a_top < b_top + b_h and b_top < a_top + a_h and a_left < b_left + b_w and b_left < a_left + a_w
+
+
+def _listed(kept):
+    # registry entries of a region's kept structures (its dirt comes from the tiles, see _dirt_rects)
+    return [entry[:5] for entry in kept if entry[0] != "dirt"]
+
+
+def _dirt_rects(dirt, top, left):
+    # the DIRT of a bool array at (top, left), on region bounds, as
+    # ("dirt", r, c, h, w) entries: runs along each row (split at region
+    # edges), a run extending the rect above it when it spans the same
+    # columns in the same region. returns {region: entries}, row-major
+    height, width = dirt.shape
+    bands = np.zeros((height, width // REGION_TILES, REGION_TILES + 2), dtype=np.int8)
+    bands[:, :, 1:-1] = dirt.reshape(height, -1, REGION_TILES)
+    edges = np.diff(bands, axis=2)
+    rows, band, starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)[2]
+
+    # sorted by columns, then row: a run right under an identical one continues its rect
+    order = np.lexsort((rows, ends, starts, band))
+    rows, band, starts, ends = rows[order], band[order], starts[order], ends[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = ((band[1:] != band[:-1]) | (starts[1:] != starts[:-1]) | (ends[1:] != ends[:-1]) |
+                 (rows[1:] != rows[:-1] + 1) | (rows[1:] % REGION_TILES == 0))
+    heights = np.diff(np.append(np.flatnonzero(first), len(rows)))
+    rows, cols, widths = rows[first] + top, band[first] * REGION_TILES + starts[first] + left, (ends - starts)[first]
+
+    rects = {}
+    order = np.lexsort((cols, rows, cols // REGION_TILES, rows // REGION_TILES))
+    for r, c, h, w in zip(rows[order].tolist(), cols[order].tolist(), heights[order].tolist(), widths[order].tolist()):
+        rects.setdefault((r // REGION_TILES, c // REGION_TILES), []).append(("dirt", r, c, h, w))
+    return rects
+
+
+def _pattern(*rows):
+    # tiles and "draw here" mask of a structure from a picture of it
+    key = {"L": LEAVES, "W": WOOD, "B": BRICK}
+    tiles = np.array([[key.get(ch, GRASS) for ch in row] for row in rows], dtype=np.uint8)
+    mask = np.array([[ch != "." for ch in row] for row in rows])
+    return tiles, mask
+
+
+_PATTERNS = {
+    "tree": _pattern(".L.",
+                     "LWL",
+                     ".L."),
+    "house": _pattern("BBBB",
+                      "BWWB",
+                      "BWWB",
+                      "BBBB"),
+    # 2x2 trunk inside a 4x4 canopy, plus 2-wide arms on each side
+    "big_tree": _pattern("..LL..",
+                         ".LLLL.",
+                         "LLWWLL",
+                         "LLWWLL",
+                         ".LLLL.",
+                         "..LL.."),
+}
+
+
+def _stamp(cells, top, left, entry):
+    # draw one layout entry into a tile array at (top, left), clipped to it
+    kind, t, l, h, w, pad, spots = entry
+    if kind == "lake":
+        _fill_clipped(cells, top, left, t, l, t + h, l + w, WATER)
+    elif kind == "dirt":
+        _fill_clipped(cells, top, left, t, l, t + h, l + w, DIRT)
+    elif kind == "vein":
+        rows, cols = cells.shape
+        for r, c in spots:
+            r, c = r - top, c - left
+            if 0 <= r < rows and 0 <= c < cols:
+                cells[r, c] = STONE
+    else:
+        tiles, mask = _PATTERNS[kind]
+        t, l = t - top, l - left
+        r0, r1 = max(t, 0), min(t + h, cells.shape[0])
+        c0, c1 = max(l, 0), min(l + w, cells.shape[1])
+        if r0 < r1 and c0 < c1:
+            np.copyto(cells[r0:r1, c0:c1], tiles[r0 - t:r1 - t, c0 - l:c1 - l], where=mask[r0 - t:r1 - t, c0 - l:c1 - l])
+
+
+def _stamp_many(cells, entries):
+    # _stamp for a whole world's worth of entries at (0, 0), a kind at a
+    # time; they never overlap and all lie inside the world
+    by_kind = {}
+    for entry in entries:
+        by_kind.setdefault(entry[0], []).append(entry)
+    for kind, group in by_kind.items():
+        if kind in _PATTERNS:
+            tiles, mask = _PATTERNS[kind]
+            dr, dc = np.nonzero(mask)
+            origins = np.array([entry[1:3] for entry in group])
+            cells[origins[:, :1] + dr, origins[:, 1:] + dc] = tiles[dr, dc]
+        elif kind == "vein":
+            spots = np.array([spot for entry in group for spot in entry[6]])
+            cells[spots[:, 0], spots[:, 1]] = STONE
+        else:
+            for entry in group:
+                _stamp(cells, 0, 0, entry)
+
+
+def _stamp_altar(cells, top, left, altar_pos):
+    # 5x5 brick ring, 3x3 stone ring, center CORE
+    altar_r, altar_c = altar_pos
+    _fill_clipped(cells, top, left, altar_r - 2, altar_c - 2, altar_r + 3, altar_c + 3, BRICK)
+    _fill_clipped(cells, top, left, altar_r - 1, altar_c - 1, altar_r + 2, altar_c + 2, STONE)
+    _fill_clipped(cells, top, left, altar_r, altar_c, altar_r + 1, altar_c + 1, CORE)
+
+
+class RegionGenerator:
+    def __init__(self, preset, difficulty, rows, cols, seed, altar_pos, infinite=False):
+        self.preset = preset
+        self.difficulty = difficulty
+        self.rows = rows
+        self.cols = cols
+        self.seed = seed
+        self.altar_pos = altar_pos
+        self.infinite = infinite
+        self.region_rows = (rows + REGION_TILES - 1) // REGION_TILES
+        self.region_cols = (cols + REGION_TILES - 1) // REGION_TILES
+
+        crowded = (preset == "crowded")
+        hard = (difficulty == "hard")
+        structure_factor = 0.6 if (hard and not crowded) else 1.0
+
+        self.crowded = crowded
+        self.terrain = (preset == "terrain")
+        terrain_rng = random.Random(f"{seed}:terrain")
+        self.elevation_key = terrain_rng.getrandbits(32)
+        self.soil_key = terrain_rng.getrandbits(32)
+        self.lake_count = int((60 if crowded else 30) * structure_factor)
+        self.tree_count = int((250 if crowded else 140) * structure_factor)
+        self.house_count = int((55 if crowded else 28) * structure_factor)
+        self.rock_vein_count = int((150 if crowded else 85) * structure_factor)
+        self.big_tree_count = int((80 if crowded else 42) * structure_factor)
+        self.dirt_patch_count = int((220 if crowded else 130) * structure_factor)
+
+        self._bases = OrderedDict()     # region -> base tiles
+        self._layouts = OrderedDict()   # region -> layout
+        self._kept = OrderedDict()      # region -> layout, collisions dropped
+
+    def __getstate__(self):
+        # the caches stay behind when the generator goes to a worker process
+        state = self.__dict__.copy()
+        state["_bases"] = OrderedDict()
+        state["_layouts"] = OrderedDict()
+        state["_kept"] = OrderedDict()
+        return state
+
+    def to_save(self):
+        return {
+            "preset": self.preset,
+            "difficulty": self.difficulty,
+            "seed": self.seed,
+            "altar_pos": self.altar_pos,
+            "infinite": self.infinite,
+        }
+
+    def inside(self, rr, rc):
+        return self.infinite or (0 <= rr < self.region_rows and 0 <= rc < self.region_cols)
+
+    def region_bounds(self, rr, rc):
+        # top, left, bottom, right of a region, clipped to the world
+        top = rr * REGION_TILES
+        left = rc * REGION_TILES
+        bottom = top + REGION_TILES
+        right = left + REGION_TILES
+        if not self.infinite:
+            bottom = min(self.rows, bottom)
+            right = min(self.cols, right)
+        return top, left, bottom, right
+
+    def _cached(self, cache, key, make):
+        value = cache.get(key)
+        if value is None:
+            value = cache[key] = make(*key)
+            if len(cache) > LAYOUT_CACHE_SIZE:
+                cache.popitem(last=False)
+        return value
+
+    # ------------------------------------------------------
+    # base tiles: grass, or the terrain's lakes, rock and dirt
+    # ------------------------------------------------------
+    def region_base(self, rr, rc):
+        # shared with the cache, copy before writing to it
+        return self._cached(self._bases, (rr, rc), self._make_base)
+
+    def _make_base(self, rr, rc):
+        # tiles past the world edge are never read; leaving them GRASS
+        # keeps edge chunks uniform
+        cells = np.full((REGION_TILES, REGION_TILES), GRASS, dtype=np.uint8)
+        if not self.terrain or not self.inside(rr, rc):
+            return cells
+
+        top, left, bottom, right = self.region_bounds(rr, rc)
+        altar_r, altar_c = self.altar_pos
+        elevation = noise_field(self.elevation_key, top, left, TERRAIN_OCTAVES)
+        soil = noise_field(self.soil_key, top, left, SOIL_OCTAVES)
+        cells[soil > TERRAIN_DIRT] = DIRT
+        cells[elevation < TERRAIN_WATER] = WATER
+        cells[elevation > TERRAIN_STONE] = STONE
+        cells[bottom - top:, :] = GRASS
+        cells[:, right - left:] = GRASS
+        # keep the altar reachable
+        _fill_clipped(cells, top, left, altar_r - 4, altar_c - 4, altar_r + 5, altar_c + 5, GRASS)
+        return cells
+
+    # ------------------------------------------------------
+    # layouts: [(kind, top, left, height, width, pad, spots)] of
+    # the structures starting in a region, in placement order
+    # (spots: the stone tiles of a vein)
+    # ------------------------------------------------------
+    def layout(self, rr, rc):
+        return self._cached(self._layouts, (rr, rc), self._make_layout)
+
+    def _make_layout(self, rr, rc, window=None):
+        # window: the base tiles of the region plus the STRUCTURE_REACH
+        # margin its structures can reach into (built from the cached
+        # bases when not given); placement draws into it
+        if self.preset == "free" or not self.inside(rr, rc):
+            return []
+
+        top, left, bottom, right = self.region_bounds(rr, rc)
+        reach = STRUCTURE_REACH
+        if window is None:
+            window = np.vstack([np.hstack([self.region_base(rr + dr, rc + dc) for dc in (-1, 0, 1)])
+                                for dr in (-1, 0, 1)])
+            window = window[REGION_TILES - reach:2 * REGION_TILES + reach,
+                            REGION_TILES - reach:2 * REGION_TILES + reach]
+        wtop, wleft = top - reach, left - reach
+
+        rng = random.Random(f"{self.seed}:{rr}:{rc}")
+        area_share = (bottom - top) * (right - left) / REFERENCE_AREA
+
+        def count_for(total):
+            expected = total * area_share
+            n = int(expected)
+            if rng.random() < expected - n:
+                n += 1
+            return n
+
+        occupancy = OccupancyIndex(window, wtop, wleft, self.altar_pos)
+        layout = []
+
+        def place(kind, row, col, height, width, pad, spots=None):
+            entry = (kind, row, col, height, width, pad, spots)
+            _stamp(window, wtop, wleft, entry)
+            occupancy.mark(row - wtop, col - wleft, height, width)
+            layout.append(entry)
+
+        def area_is_clear(row, col, height, width, pad):
+            t, l = row - pad, col - pad
+            b, rt = row + height + pad, col + width + pad
+            if not self.infinite and (t < 0 or l < 0 or b > self.rows or rt > self.cols):
+                return False
+            return occupancy.is_clear(t - wtop, l - wleft, b - t, rt - l)
+
+        def spot():
+            # random top-left corner (world tiles) inside the region
+            return top + rng.randrange(bottom - top), left + rng.randrange(right - left)
+
+        crowded = self.crowded
+        terrain = self.terrain
+        pad = 1 if crowded else 2
+
+        # lakes
+        for _ in range(0 if terrain else count_for(self.lake_count)):
+            for _ in range(80):
+                size = rng.randint(3, 5)
+                row, col = spot()
+                if area_is_clear(row, col, size, size, 2):
+                    place("lake", row, col, size, size, 2)
+                    break
+
+        # small trees
+        for _ in range(count_for(self.tree_count)):
+            attempts = 200 if crowded else 120
+            for _ in range(attempts):
+                row, col = spot()
+                if area_is_clear(row, col, 3, 3, 2):
+                    place("tree", row, col, 3, 3, 2)
+                    break
+
+        # houses (4x4)
+        for _ in range(count_for(self.house_count)):
+            for _ in range(140):
+                row, col = spot()
+                if area_is_clear(row, col, 4, 4, pad):
+                    place("house", row, col, 4, 4, pad)
+                    break
+
+        # rock veins
+        for _ in range(0 if terrain else count_for(self.rock_vein_count)):
+            for _ in range(140):
+                row, col = spot()
+                if area_is_clear(row, col, 4, 4, pad):
+                    n = rng.randint(6, 12)
+                    spots = [(row + r, col + c) for r in range(4) for c in range(4)]
+                    rng.shuffle(spots)
+                    place("vein", row, col, 4, 4, pad, tuple(spots[:n]))
+                    break
+
+        # big trees
+        for _ in range(count_for(self.big_tree_count)):
+            for _ in range(160):
+                row, col = spot()
+                if area_is_clear(row, col, 6, 6, pad):
+                    place("big_tree", row, col, 6, 6, pad)
+                    break
+
+        # dirt patches
+        patch_sizes = [(1, 2), (2, 1), (2, 2), (2, 3), (3, 2)]
+        for _ in range(0 if terrain else count_for(self.dirt_patch_count)):
+            for _ in range(120):
+                h, w = rng.choice(patch_sizes)
+                row, col = spot()
+                if area_is_clear(row, col, h, w, pad):
+                    place("dirt", row, col, h, w, pad)
+                    break
+
+        return layout
+
+    def kept(self, rr, rc):
+        return self._cached(self._kept, (rr, rc), self._make_kept)
+
+    def _make_kept(self, rr, rc, layout_of=None):
+        # the layout minus structures that give way to one (with their
+        # padding) from a neighbour that sorts before this region; only
+        # structures within STRUCTURE_REACH of it can get in the way
+        layout_of = layout_of or self.layout
+        layout = layout_of(rr, rc)
+        reach = STRUCTURE_REACH
+        top, left = rr * REGION_TILES - reach, rc * REGION_TILES - reach
+        size = REGION_TILES + 2 * reach
+        near = [o for dr, dc in NEIGHBOURHOOD if (dr, dc) < (0, 0)
+                for o in layout_of(rr + dr, rc + dc)
+                if _rects_overlap(o[1], o[2], o[3], o[4], top, left, size, size)]
+        if not near:
+            return layout
+        kept = []
+        for entry in layout:
+            kind, t, l, h, w, pad, _ = entry
+            t, l, h, w = t - pad, l - pad, h + 2 * pad, w + 2 * pad
+            if not any(_rects_overlap(t, l, h, w, o[1], o[2], o[3], o[4]) for o in near):
+                kept.append(entry)
+        return kept
+
+    def generate_region(self, rr, rc):
+        top, left, bottom, right = self.region_bounds(rr, rc)
+        cells = self.region_base(rr, rc).copy()
+        altar_r, altar_c = self.altar_pos
+        structures = _listed(self.kept(rr, rc))
+
+        # every structure that reaches this region starts in one of the 3x3 around it
+        for dr, dc in NEIGHBOURHOOD:
+            kept = self.kept(rr + dr, rc + dc)
+            for entry in kept:
+                if (dr, dc) == (0, 0) or \
+                        _rects_overlap(entry[1], entry[2], entry[3], entry[4], top, left, REGION_TILES, REGION_TILES):
+                    _stamp(cells, top, left, entry)
+
+        # ======================================================
+        # ALTAR (ALWAYS GENERATED, even on "free")
+        # it may straddle regions, so each one stamps its own part
+        # ======================================================
+        _stamp_altar(cells, top, left, self.altar_pos)
+        if top <= altar_r < bottom and left <= altar_c < right:
+            structures.append(("altar", altar_r - 2, altar_c - 2, 5, 5))
+
+        dirt = cells == DIRT
+        dirt[bottom - top:, :] = dirt[:, right - left:] = False
+        structures += _dirt_rects(dirt, top, left).get((rr, rc), [])
+        return cells, structures
+
+    def generate_all(self, progress=None, cancel=None):
+        # every region of a finite world in one go: (tiles of all the
+        # regions as one array, {region: structures}), the same as
+        # generate_region gives region by region. base tiles go straight
+        # into the one array, and every structure is stamped once, a kind
+        # at a time, instead of once per region it reaches.
+        # each region goes through three passes (base, layout, collisions):
+        # progress(done, total) after every region of every pass, and a
+        # set `cancel` event stops between regions, returning None
+        rows, cols = self.region_rows * REGION_TILES, self.region_cols * REGION_TILES
+        keys = [(rr, rc) for rr in range(self.region_rows) for rc in range(self.region_cols)]
+        total = 3 * len(keys)
+        done = 0
+
+        def step():
+            nonlocal done
+            if cancel is not None and cancel.is_set():
+                return False
+            done += 1
+            if progress:
+                progress(done, total)
+            return True
+
+        margin = STRUCTURE_REACH
+        # a margin of grass all round, for the layout windows at the edges
+        padded = np.full((rows + 2 * margin, cols + 2 * margin), GRASS, dtype=np.uint8)
+        cells = padded[margin:margin + rows, margin:margin + cols]
+        for rr, rc in keys:
+            cells[rr * REGION_TILES:(rr + 1) * REGION_TILES, rc * REGION_TILES:(rc + 1) * REGION_TILES] = \
+                self._make_base(rr, rc)
+            if not step():
+                return None
+
+        size = REGION_TILES + 2 * margin
+        layouts = {}
+        for rr, rc in keys:
+            top, left = rr * REGION_TILES, rc * REGION_TILES
+            layouts[(rr, rc)] = self._make_layout(rr, rc, window=padded[top:top + size, left:left + size].copy())
+            if not step():
+                return None
+
+        def layout_of(rr, rc):
+            return layouts.get((rr, rc), [])
+
+        kept = {}
+        for key in keys:
+            kept[key] = self._make_kept(*key, layout_of=layout_of)
+            if not step():
+                return None
+        structures = {key: _listed(kept[key]) for key in keys}
+        _stamp_many(cells, [entry for entries in kept.values() for entry in entries])
+
+        altar_r, altar_c = self.altar_pos
+        _stamp_altar(cells, 0, 0, self.altar_pos)
+        structures[(altar_r // REGION_TILES, altar_c // REGION_TILES)].append(("altar", altar_r - 2, altar_c - 2, 5, 5))
+        dirt = cells == DIRT
+        dirt[self.rows:, :] = dirt[:, self.cols:] = False
+        for key, rects in _dirt_rects(dirt, 0, 0).items():
+            structures[key] += rects
+        return cells, structures
+
+
+# ==========================================================
+# WORLD GENERATION (NOW RETURNS altar tile coords)
+# the world is returned empty; regions are generated the first
+# time one of their chunks is touched. infinite worlds use
+# rows/cols only to place the altar and the spawn.
+# ==========================================================
+def generate_world(preset, difficulty, rows, cols, seed=None, infinite=False, chunk_budget=None):
+    if seed is None:
+        seed = random.randrange(1 << 32)
+
+    rng = random.Random(seed)
+    altar_r = rng.randint(10, rows - 11)
+    altar_c = rng.randint(10, cols - 11)
+
+    generator = RegionGenerator(preset, difficulty, rows, cols, seed, (altar_r, altar_c), infinite)
+    world = WorldGrid(rows, cols, fill=GRASS, outside=VOID, generator=generator,
+                      infinite=infinite, chunk_budget=chunk_budget)
+
+    print(f"[DEBUG] SEED = {seed!r}  ALTAR CORE TILE = ({altar_r}, {altar_c})")
+
+    return world, (altar_r, altar_c)
+
+
+def parse_seed(text):
+    # seed typed in the start menu: blank -> random, digits -> int, anything else as-is
+    text = text.strip()
+    if not text:
+        return None
+    return int(text) if text.isdigit() else text
+
+
+# ==========================================================
+# PREGENERATION
+# regions only depend on (seed, region), so a finite world can be
+# built in any order, across processes, and still come out the same
+# ==========================================================
+def missing_near(world, r, c, reach=None):
+    # regions of a finite world not generated yet, nearest the tile (r, c)
+    # first; only those within `reach` tiles of it when given
+    keys = world.missing_regions()
+    if reach is not None:
+        rr0, rr1 = (r - reach) // REGION_TILES, (r + reach) // REGION_TILES
+        rc0, rc1 = (c - reach) // REGION_TILES, (c + reach) // REGION_TILES
+        keys = [(rr, rc) for rr, rc in keys if rr0 <= rr <= rr1 and rc0 <= rc <= rc1]
+    half = REGION_TILES // 2
+    keys.sort(key=lambda k: (k[0] * REGION_TILES + half - r) ** 2 + (k[1] * REGION_TILES + half - c) ** 2)
+    return keys
+
+
+def pregenerate(world, workers=None, progress=None, cancel=None, keys=None):
+    # keys: the regions to build, every missing one by default.
+    # progress(done, total) as regions go by; a set `cancel` event stops early
+    if keys is None:
+        keys = world.missing_regions()
+    if not keys or world.generator is None:
+        return
+    if workers is None:
+        workers = os.cpu_count() or 1
+    generator = world.generator
+    total = len(keys)
+
+    if (workers <= 1 or total < PARALLEL_MIN_REGIONS) and total == world.region_rows * world.region_cols:
+        # nothing generated yet: the whole world at once, chunks encoded together
+        # the three passes of generate_all, then the installs
+        def generated(done, steps):
+            if progress:
+                progress(done, steps + total)
+
+        built = generator.generate_all(progress=generated, cancel=cancel)
+        if built is None:
+            return
+        cells, structures = built
+        h, w = cells.shape
+        blocks = cells.reshape(h // CHUNK_SIZE, CHUNK_SIZE, w // CHUNK_SIZE, CHUNK_SIZE).swapaxes(1, 2)
+        chunks = encode_chunks(blocks.reshape(-1, CHUNK_AREA))
+        per_row = w // CHUNK_SIZE
+        for done, (rr, rc) in enumerate(keys, 1):
+            if cancel is not None and cancel.is_set():
+                return
+            first = rr * REGION_CHUNKS * per_row + rc * REGION_CHUNKS
+            region_chunks = [chunks[first + i * per_row + j] for i in range(REGION_CHUNKS) for j in range(REGION_CHUNKS)]
+            world.install_region(rr, rc, None, structures[(rr, rc)], region_chunks)
+            if progress:
+                progress(3 * total + done, 4 * total)
+        return
+
+    if workers <= 1 or total < PARALLEL_MIN_REGIONS:
+        for done, (rr, rc) in enumerate(keys, 1):
+            if cancel is not None and cancel.is_set():
+                return
+            world.install_region(rr, rc, *generator.generate_region(rr, rc))
+            if progress:
+                progress(done, total)
+        return
+
+    # spawned, not forked: this runs on WorldBuilder's thread after SDL is
+    # up, and a fork there copies locks other threads may be holding
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        chunksize = max(1, total // (workers * 4))
+        results = pool.map(generator.generate_region, [k[0] for k in keys], [k[1] for k in keys],
+                           chunksize=chunksize)
+        for done, ((rr, rc), (cells, structures)) in enumerate(zip(keys, results), 1):
+            if cancel is not None and cancel.is_set():
+                pool.shutdown(wait=False, cancel_futures=True)
+                return
+            world.install_region(rr, rc, cells, structures)
+            if progress:
+                progress(done, total)
+
+
+# ==========================================================
+# BACKGROUND BUILD
+# generate_world + the regions round the spawn on a worker thread,
+# so the start menu can keep drawing while a world is built
+# speculatively. the rest of a finite world is left to the game
+# (see run_game). the world isn't touched by anyone else until `ready`.
+# ==========================================================
+class WorldBuilder:
+    def __init__(self, preset, difficulty, rows, cols, seed=None, infinite=False, chunk_budget=None):
+        self.key = (preset, difficulty, seed, infinite)
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self._args = (preset, difficulty, rows, cols, seed, infinite, chunk_budget)
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        world, altar_pos = generate_world(*self._args)
+        keys = missing_near(world, world.rows // 2, world.cols // 2, SPAWN_REACH)
+        self.total = len(keys)
+        pregenerate(world, progress=self._progress, cancel=self._cancel, keys=keys)
+        if not self._cancel.is_set():
+            self.result = (world, altar_pos)
+
+    def _progress(self, done, total):
+        self.done = done
+        self.total = total
+
+    @property
+    def ready(self):
+        return self.result is not None
+
+    @property
+    def finished(self):
+        return not self._thread.is_alive()
+
+    @property
+    def fraction(self):
+        if self.ready:
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self):
+        self._thread.join()
+        return self.result
+
+
+def load_world(data, chunk_budget=None):
+    # rebuild a saved world, reattaching its generator if it has one.
+    # the chunk budget only applies to infinite worlds
+    gen = data.get("generator") if isinstance(data, dict) else None
+    generator = None
+    if gen:
+        generator = RegionGenerator(
+            gen["preset"], gen["difficulty"], data["rows"], data["cols"],
+            gen["seed"], tuple(gen["altar_pos"]), gen.get("infinite", False),
+        )
+    infinite = isinstance(data, dict) and data.get("infinite", False)
+    return WorldGrid.from_save(data, fill=GRASS, outside=VOID, generator=generator,
+                               chunk_budget=chunk_budget if infinite else None)